@@ -0,0 +1,49 @@
+"""add telegram outbox table
+
+Revision ID: 4c1d2e7f9a3b
+Revises: 91a37f3e1550
+Create Date: 2026-10-17 10:12:31.402117
+
+Очередь не заполняется задним числом: до этой ревизии отчеты отправлялись
+фоновой задачей сразу после создания, и признак доставки нигде не хранился,
+поэтому отличить недоставленные отчеты от доставленных нельзя. Если отчет
+не дошел до Telegram до обновления, его нужно переотправить вручную.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1d2e7f9a3b'
+down_revision: Union[str, None] = '91a37f3e1550'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('telegram_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('report_type', sa.String(length=50), nullable=False),
+    sa.Column('report_id', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_telegram_outbox_id'), 'telegram_outbox', ['id'], unique=False)
+    op.create_index('ix_telegram_outbox_status_next_attempt_at', 'telegram_outbox', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_telegram_outbox_status_next_attempt_at', table_name='telegram_outbox')
+    op.drop_index(op.f('ix_telegram_outbox_id'), table_name='telegram_outbox')
+    op.drop_table('telegram_outbox')
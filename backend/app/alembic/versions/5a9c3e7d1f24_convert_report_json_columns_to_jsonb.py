@@ -0,0 +1,53 @@
+"""convert report json columns to jsonb with gin indexes
+
+Revision ID: 5a9c3e7d1f24
+Revises: e3f8a2b6c4d1
+Create Date: 2026-10-17 17:48:12.904355
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9c3e7d1f24'
+down_revision: Union[str, None] = 'e3f8a2b6c4d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Таблица -> (колонка, nullable)
+JSONB_COLUMNS = {
+    'dailyinventoryv2': [('inventory_data', False)],
+    'reportongoods': [('kuxnya', False), ('bar', False), ('upakovki_xoz', False)],
+    'writeofftransfer': [('writeoffs', False), ('transfers', False)],
+    'shift_reports': [('income_entries', True), ('expense_entries', True)],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, columns in JSONB_COLUMNS.items():
+        for column, nullable in columns:
+            op.alter_column(table, column,
+                            existing_type=sa.JSON(),
+                            type_=postgresql.JSONB(astext_type=sa.Text()),
+                            existing_nullable=nullable,
+                            postgresql_using=f'{column}::jsonb')
+            op.create_index(f'ix_{table}_{column}_gin', table, [column], unique=False,
+                            postgresql_using='gin', postgresql_ops={column: 'jsonb_path_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, columns in JSONB_COLUMNS.items():
+        for column, nullable in columns:
+            op.drop_index(f'ix_{table}_{column}_gin', table_name=table,
+                          postgresql_using='gin', postgresql_ops={column: 'jsonb_path_ops'})
+            op.alter_column(table, column,
+                            existing_type=postgresql.JSONB(astext_type=sa.Text()),
+                            type_=sa.JSON(),
+                            existing_nullable=nullable,
+                            postgresql_using=f'{column}::json')
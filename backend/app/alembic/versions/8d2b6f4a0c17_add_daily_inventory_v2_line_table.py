@@ -0,0 +1,49 @@
+"""add daily inventory v2 line table
+
+Revision ID: 8d2b6f4a0c17
+Revises: 5a9c3e7d1f24
+Create Date: 2026-10-17 19:05:44.217630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2b6f4a0c17'
+down_revision: Union[str, None] = '5a9c3e7d1f24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_inventory_v2_line',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('inventory_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['inventory_id'], ['dailyinventoryv2.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_daily_inventory_v2_line_inventory_id'), 'daily_inventory_v2_line', ['inventory_id'], unique=False)
+    op.create_index('ix_daily_inventory_v2_line_item_id_inventory_id', 'daily_inventory_v2_line', ['item_id', 'inventory_id'], unique=False)
+
+    # Заполняем строки для уже сохраненных инвентаризаций из inventory_data
+    op.execute("""
+        INSERT INTO daily_inventory_v2_line (inventory_id, item_id, quantity)
+        SELECT d.id, (entry->>'item_id')::integer, (entry->>'quantity')::integer
+        FROM dailyinventoryv2 AS d
+        CROSS JOIN LATERAL jsonb_array_elements(d.inventory_data) AS entry
+        WHERE jsonb_typeof(d.inventory_data) = 'array'
+        ORDER BY d.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_daily_inventory_v2_line_item_id_inventory_id', table_name='daily_inventory_v2_line')
+    op.drop_index(op.f('ix_daily_inventory_v2_line_inventory_id'), table_name='daily_inventory_v2_line')
+    op.drop_table('daily_inventory_v2_line')
@@ -0,0 +1,28 @@
+"""add photo_paths to report on goods
+
+Revision ID: b7e4a1c9d2f5
+Revises: 4c1d2e7f9a3b
+Create Date: 2026-10-17 14:03:52.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4a1c9d2f5'
+down_revision: Union[str, None] = '4c1d2e7f9a3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reportongoods', sa.Column('photo_paths', sa.JSON(), server_default='[]', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('reportongoods', 'photo_paths')
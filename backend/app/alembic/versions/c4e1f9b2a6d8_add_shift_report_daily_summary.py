@@ -0,0 +1,54 @@
+"""add shift report daily summary
+
+Revision ID: c4e1f9b2a6d8
+Revises: 8d2b6f4a0c17
+Create Date: 2026-10-17 20:31:09.648201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e1f9b2a6d8'
+down_revision: Union[str, None] = '8d2b6f4a0c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SUMMARY_FIELDS = [
+    'total_revenue', 'returns', 'acquiring', 'qr_code', 'online_app', 'yandex_food',
+    'yandex_food_no_system', 'primehill', 'total_acquiring', 'total_income',
+    'total_expenses', 'fact_cash', 'surplus_shortage',
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('shift_report_daily_summary',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('location', sa.String(length=255), nullable=False),
+    sa.Column('cashier_name', sa.String(length=255), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('reports_count', sa.Integer(), nullable=False),
+    *[sa.Column(field, sa.Numeric(precision=14, scale=2), nullable=False) for field in SUMMARY_FIELDS],
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('location', 'day', 'cashier_name', name='uq_shift_report_daily_summary_location_day_cashier')
+    )
+
+    # Итоги по уже сохраненным отчетам (день - по московскому времени, как в ShiftReportCRUD)
+    fields = ', '.join(SUMMARY_FIELDS)
+    sums = ', '.join(f'COALESCE(SUM({field}), 0)' for field in SUMMARY_FIELDS)
+    op.execute(f"""
+        INSERT INTO shift_report_daily_summary (location, cashier_name, day, reports_count, {fields})
+        SELECT location, cashier_name, (date AT TIME ZONE 'Europe/Moscow')::date, COUNT(*), {sums}
+        FROM shift_reports
+        GROUP BY location, cashier_name, (date AT TIME ZONE 'Europe/Moscow')::date
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('shift_report_daily_summary')
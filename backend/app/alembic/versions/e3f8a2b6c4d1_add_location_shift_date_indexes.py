@@ -0,0 +1,37 @@
+"""add location/shift/date indexes to report tables
+
+Revision ID: e3f8a2b6c4d1
+Revises: b7e4a1c9d2f5
+Create Date: 2026-10-17 16:21:07.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3f8a2b6c4d1'
+down_revision: Union[str, None] = 'b7e4a1c9d2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REPORT_TABLES = ['shift_reports', 'dailyinventory', 'dailyinventoryv2', 'reportongoods', 'writeofftransfer']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in REPORT_TABLES:
+        op.create_index(f'ix_{table}_location_date', table, ['location', sa.text('date DESC')], unique=False)
+        op.create_index(f'ix_{table}_location_shift_type_date', table, ['location', 'shift_type', 'date'], unique=False)
+    op.create_index('ix_shift_reports_draft_date', 'shift_reports', ['date'], unique=False,
+                    postgresql_where=sa.text("status = 'draft'"), sqlite_where=sa.text("status = 'draft'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_shift_reports_draft_date', table_name='shift_reports')
+    for table in reversed(REPORT_TABLES):
+        op.drop_index(f'ix_{table}_location_shift_type_date', table_name=table)
+        op.drop_index(f'ix_{table}_location_date', table_name=table)
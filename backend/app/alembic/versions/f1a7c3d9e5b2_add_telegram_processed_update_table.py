@@ -0,0 +1,34 @@
+"""add telegram processed update table
+
+Revision ID: f1a7c3d9e5b2
+Revises: c4e1f9b2a6d8
+Create Date: 2026-10-17 22:04:51.187203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a7c3d9e5b2'
+down_revision: Union[str, None] = 'c4e1f9b2a6d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('telegram_processed_update',
+    sa.Column('update_id', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('processed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('update_id')
+    )
+    op.create_index('ix_telegram_processed_update_processed_at', 'telegram_processed_update', ['processed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_telegram_processed_update_processed_at', table_name='telegram_processed_update')
+    op.drop_table('telegram_processed_update')
@@ -6,6 +6,9 @@ from .writeoff_transfer import router as writeoff_transfer_router
 from .telegram_webhook import router as telegram_webhook_router
 from .inventory_management import router as inventory_management_router
 from .daily_inventory_v2 import router as daily_inventory_v2_router
+from .metrics import router as metrics_router
+from .exports import router as exports_router
+from .tasks import router as tasks_router
 from fastapi import APIRouter
 
 api_router = APIRouter()
@@ -15,4 +18,7 @@ api_router.include_router(report_on_goods_router, prefix="/report-on-goods", tag
 api_router.include_router(writeoff_transfer_router, prefix="/writeoff-transfer", tags=["writeoff-transfer"])
 api_router.include_router(telegram_webhook_router, prefix="/telegram", tags=["Telegram"])
 api_router.include_router(inventory_management_router, prefix="/inventory-management", tags=["Inventory Management"])
-api_router.include_router(daily_inventory_v2_router, prefix="/daily-inventory-v2", tags=["Daily Inventory V2"])
\ No newline at end of file
+api_router.include_router(daily_inventory_v2_router, prefix="/daily-inventory-v2", tags=["Daily Inventory V2"])
+api_router.include_router(exports_router, prefix="/exports", tags=["Exports"])
+api_router.include_router(tasks_router, prefix="/tasks", tags=["Tasks"])
+api_router.include_router(metrics_router, tags=["Metrics"])
@@ -6,6 +6,7 @@ from app.core import get_db
 from app.crud import DailyInventoryCrud
 
 router = APIRouter()
+daily_inventory_crud = DailyInventoryCrud()
 
 
 @router.post(
@@ -242,7 +243,7 @@ async def daily_inventory_create(
             kuriza_siraya=kuriza_siraya,
         )
 
-        return await DailyInventoryCrud().create_daily_inventory(db, daily_data)
+        return await daily_inventory_crud.create_daily_inventory(db, daily_data)
 
     except Exception as e:
         raise HTTPException(
@@ -1,10 +1,15 @@
 # backend/app/api/daily_inventory_v2.py
+from datetime import datetime
 from typing import Dict, Any, List, Optional
+import json
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core import get_db
+from app.core.pagination import CountMode
 from app.crud.daily_inventory_v2 import DailyInventoryV2CRUD
 from app.schemas.daily_inventory_v2 import DailyInventoryV2Create, DailyInventoryV2Response
 
@@ -50,42 +55,98 @@ async def get_detailed_inventory(
 @router.get(
     "/list",
     summary="Получить список инвентаризаций",
-    description="Получает список всех инвентаризаций с возможностью фильтрации"
+    description="Получает список всех инвентаризаций с возможностью фильтрации. "
+                "Для следующей страницы передайте next_cursor из ответа в параметр cursor"
 )
 async def get_inventories_list(
         location: Optional[str] = Query(None, description="Фильтр по локации"),
         shift_type: Optional[str] = Query(None, description="Фильтр по типу смены"),
-        skip: int = Query(0, ge=0, description="Пропустить записей"),
+        item_id: Optional[int] = Query(None, description="Только инвентаризации с этим товаром"),
+        cursor: Optional[str] = Query(None, description="Курсор следующей страницы (next_cursor)"),
+        skip: int = Query(0, ge=0, description="Пропустить записей (устарело, используйте cursor)"),
         limit: int = Query(100, ge=1, le=1000, description="Максимум записей"),
+        count: CountMode = Query("exact", description="Подсчет total: exact, estimated или none"),
         db: AsyncSession = Depends(get_db)
 ):
     """Получить список инвентаризаций с фильтрацией"""
-    inventories, total = await inventory_v2_crud.get_inventory_list(
-        db, location=location, shift_type=shift_type, skip=skip, limit=limit
+    inventories, total, next_cursor = await inventory_v2_crud.get_inventory_list(
+        db, location=location, shift_type=shift_type, item_id=item_id, skip=skip, limit=limit,
+        cursor=cursor, count_mode=count
     )
 
     # Преобразуем в простой формат для ответа
-    inventory_list = []
-    for inventory in inventories:
-        inventory_list.append({
-            "id": inventory.id,
-            "location": inventory.location,
-            "shift_type": inventory.shift_type,
-            "cashier_name": inventory.cashier_name,
-            "date": inventory.date,
-            "items_count": len(inventory.inventory_data) if inventory.inventory_data else 0,
-            "created_at": inventory.created_at,
-            "updated_at": inventory.updated_at
-        })
+    inventory_list = [dict(inventory._mapping) for inventory in inventories]
 
     return {
         "inventories": inventory_list,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor
     }
 
 
+@router.get(
+    "/items/{item_id}/history",
+    summary="История остатков товара",
+    description="Остатки товара по всем инвентаризациям в порядке даты"
+)
+async def get_item_history(
+        item_id: int,
+        location: Optional[str] = Query(None, description="Фильтр по локации"),
+        date_from: Optional[datetime] = Query(None, alias="from", description="С даты (включительно)"),
+        date_to: Optional[datetime] = Query(None, alias="to", description="По дату (не включительно)"),
+        db: AsyncSession = Depends(get_db)
+):
+    """Получить историю остатков товара"""
+    rows = await inventory_v2_crud.get_item_history(
+        db, item_id, location=location, date_from=date_from, date_to=date_to
+    )
+    return {
+        "item_id": item_id,
+        "history": [dict(row._mapping) for row in rows]
+    }
+
+
+@router.get(
+    "/consumption",
+    summary="Расход товаров между инвентаризациями",
+    description="Для каждой пары соседних инвентаризаций точки считает расход каждого товара: "
+                "предыдущий остаток + приемки - списания - перемещения - текущий остаток. "
+                "Приемки и списания сопоставляются с товарами по названию, поэтому после "
+                "переименования товара движения под старым названием не учитываются. "
+                "Ответ передается потоком"
+)
+async def get_consumption(
+        date_from: datetime = Query(..., alias="from", description="С даты (включительно)"),
+        date_to: datetime = Query(..., alias="to", description="По дату (не включительно)"),
+        location: Optional[str] = Query(None, description="Фильтр по локации"),
+):
+    """Получить расход товаров за период"""
+    if date_from >= date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Дата начала должна быть раньше даты окончания"
+        )
+
+    async def generate():
+        yield '{"location": %s, "from": %s, "to": %s, "consumption": [' % (
+            json.dumps(location, ensure_ascii=False), json.dumps(date_from.isoformat()), json.dumps(date_to.isoformat())
+        )
+        separator = ""
+        try:
+            async for row in inventory_v2_crud.stream_consumption(location, date_from, date_to):
+                yield separator + json.dumps(jsonable_encoder(row), ensure_ascii=False)
+                separator = ","
+        except Exception as e:
+            # Заголовки уже отправлены - ответ обрывается, клиент получит некорректный JSON
+            print(f"❌ Ошибка расчета расхода товаров: {str(e)}")
+            raise
+        yield "]}"
+
+    return StreamingResponse(generate(), media_type="application/json")
+
+
 @router.delete(
     "/{inventory_id}",
     summary="Удалить инвентаризацию",
@@ -0,0 +1,57 @@
+# backend/app/api/exports.py
+from datetime import datetime
+from typing import Literal, Optional
+from urllib.parse import quote
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.services.export_service import EXPORTS, export_service
+
+router = APIRouter()
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+@router.get(
+    "/{report_type}",
+    summary="Выгрузить отчеты в CSV/XLSX",
+    description="Выгружает отчеты за период потоком: shift_reports, daily_inventory, daily_inventory_v2, "
+                "report_on_goods, writeoff_transfer. Инвентаризация v2, приемка и списания выгружаются "
+                "по строке на товар"
+)
+async def export_reports(
+        report_type: str,
+        export_format: Literal["csv", "xlsx"] = Query("csv", alias="format", description="Формат файла"),
+        date_from: Optional[datetime] = Query(None, alias="from", description="С даты (включительно), без часового пояса - по Москве"),
+        date_to: Optional[datetime] = Query(None, alias="to", description="По дату (не включительно), без часового пояса - по Москве"),
+        location: Optional[str] = Query(None, description="Фильтр по локации"),
+):
+    """Выгрузить отчеты"""
+    spec = EXPORTS.get(report_type)
+    if spec is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Неизвестный тип выгрузки. Доступные: {', '.join(EXPORTS)}"
+        )
+    if date_from and date_to and date_from >= date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Дата начала должна быть раньше даты окончания"
+        )
+
+    filters = {"location": location, "date_from": date_from, "date_to": date_to}
+    if export_format == "xlsx":
+        body = export_service.stream_xlsx(spec, **filters)
+    else:
+        body = export_service.stream_csv(spec, **filters)
+
+    filename = f"{report_type}_{datetime.now().strftime('%Y%m%d_%H%M')}.{export_format}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    )
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 
 from app.core import get_db
+from app.core.config import settings
 from app.crud.inventory_item import inventory_crud
+from app.services import inventory_catalog
 from app.schemas.inventory_item import (
     InventoryItemCreate,
     InventoryItemUpdate,
@@ -18,21 +20,45 @@ router = APIRouter()
     "/items",
     response_model=InventoryItemList,
     summary="Получить список товаров",
-    description="Получает список всех товаров с возможностью фильтрации"
+    description="Получает список всех товаров с возможностью фильтрации. "
+                "Поддерживает условный запрос: при совпадении If-None-Match возвращает 304",
+    responses={304: {"description": "Каталог не изменился"}}
 )
 async def get_items(
+    request: Request,
+    response: Response,
     is_active: Optional[bool] = Query(None, description="Активные товары"),
     skip: int = Query(0, ge=0, description="Пропустить записей"),
-    limit: int = Query(100, ge=1, le=1000, description="Максимум записей"),
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(100, ge=1, le=1000, description="Максимум записей")
 ):
     """Получить список товаров с фильтрацией"""
+    etag = await inventory_catalog.get_etag(is_active, skip, limit)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.INVENTORY_ITEMS_CACHE_MAX_AGE}, must-revalidate",
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
     items, total = await inventory_crud.get_items(
-        db, is_active=is_active, skip=skip, limit=limit
+        is_active=is_active, skip=skip, limit=limit
     )
+    response.headers.update(headers)
     return InventoryItemList(items=items, total=total)
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Проверяет заголовок If-None-Match (список ETag через запятую или *)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Слабое сравнение, как требует RFC 9110 для If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
 @router.get(
     "/items/{item_id}",
     response_model=InventoryItemResponse,
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.core.metrics import metrics_registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", summary="Метрики в формате Prometheus", include_in_schema=False)
+async def get_metrics():
+    """
+    Задержки по маршрутам, SQL запросы за запрос, ожидание пула соединений,
+    доставка в Telegram и состояние планировщика отправки.
+    """
+    return Response(content=metrics_registry.render(), media_type=metrics_registry.CONTENT_TYPE)
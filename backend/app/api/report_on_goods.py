@@ -289,17 +289,8 @@ async def create_report_on_goods(
             cashier_name=cashier_name
         )
 
-        photos_data = []
-        if photos:
-            for photo in photos:
-                content = await photo.read()
-                photos_data.append({
-                    "filename": photo.filename,
-                    "content": content,
-                    "content_type": photo.content_type
-                })
-
-        return await repg.create_report_on_good(db, report_on_goods_data, photos=photos_data)
+        # Фото сохраняются на диск, отправка в Telegram идет в фоне
+        return await repg.create_report_on_good(db, report_on_goods_data, photos=photos or [])
 
     except HTTPException:
         raise
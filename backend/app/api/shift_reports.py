@@ -1,11 +1,14 @@
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Optional, List, Literal
 import json
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from app.schemas import ShiftReportCreate, ShiftReportResponse, IncomeEntry, ExpenseEntry
+from app.schemas import ShiftReportCreate, ShiftReportResponse, ShiftReportList, IncomeEntry, ExpenseEntry
 from app.crud import ShiftReportCRUD
+from app.crud.shift_report_summary import shift_report_summary_crud, SUMMARY_FIELDS
 from app.core import get_db
+from app.core.pagination import CountMode
 
 router = APIRouter()
 shift_report_crud = ShiftReportCRUD()
@@ -134,6 +137,103 @@ async def create_shift_report(
         )
 
 
+@router.get(
+    "",
+    response_model=ShiftReportList,
+    response_model_exclude_unset=True,
+    summary="Список отчетов смены",
+    description="Отчеты от новых к старым с фильтрами. Для следующей страницы передайте "
+                "next_cursor из ответа в параметр cursor. Списки приходов/расходов и комментарий "
+                "возвращаются только при include=entries / include=comments"
+)
+async def get_shift_reports(
+        location: Optional[str] = Query(None, description="Фильтр по локации"),
+        cashier_name: Optional[str] = Query(None, description="Фильтр по кассиру"),
+        date_from: Optional[datetime] = Query(None, alias="from", description="С даты (включительно)"),
+        date_to: Optional[datetime] = Query(None, alias="to", description="По дату (не включительно)"),
+        report_status: Optional[Literal["draft", "sent"]] = Query(None, alias="status", description="Статус отправки"),
+        cursor: Optional[str] = Query(None, description="Курсор следующей страницы (next_cursor)"),
+        limit: int = Query(50, ge=1, le=500, description="Максимум записей"),
+        include: List[Literal["entries", "comments"]] = Query([], description="Дополнительные поля"),
+        count: CountMode = Query("exact", description="Подсчет total: exact, estimated или none"),
+        db: AsyncSession = Depends(get_db)
+):
+    """Получить страницу отчетов смены"""
+    reports, total, next_cursor = await shift_report_crud.get_shift_reports(
+        db,
+        location=location,
+        cashier_name=cashier_name,
+        date_from=date_from,
+        date_to=date_to,
+        status=report_status,
+        cursor=cursor,
+        limit=limit,
+        include_entries="entries" in include,
+        include_comments="comments" in include,
+        count_mode=count
+    )
+    return ShiftReportList(
+        reports=[dict(report._mapping) for report in reports],
+        total=total,
+        limit=limit,
+        next_cursor=next_cursor
+    )
+
+
+@router.get(
+    "/summary/daily",
+    summary="Итоги смен по дням",
+    description="Выручка, эквайринг и излишек/недостача по дням, точкам и кассирам "
+                "с накопленным итогом излишка/недостачи"
+)
+async def get_daily_summary(
+        location: Optional[str] = Query(None, description="Фильтр по локации"),
+        cashier_name: Optional[str] = Query(None, description="Фильтр по кассиру"),
+        date_from: Optional[date] = Query(None, alias="from", description="С даты (включительно)"),
+        date_to: Optional[date] = Query(None, alias="to", description="По дату (включительно)"),
+        db: AsyncSession = Depends(get_db)
+):
+    """Получить итоги смен по дням"""
+    rows = await shift_report_summary_crud.get_daily(
+        db, location=location, cashier_name=cashier_name, date_from=date_from, date_to=date_to
+    )
+    return {"days": [_summary_row(row) for row in rows]}
+
+
+@router.get(
+    "/summary/monthly",
+    summary="Итоги смен по месяцам",
+    description="Выручка, эквайринг и излишек/недостача по месяцам и точкам (опционально по кассирам)"
+)
+async def get_monthly_summary(
+        location: Optional[str] = Query(None, description="Фильтр по локации"),
+        date_from: Optional[date] = Query(None, alias="from", description="С даты (включительно)"),
+        date_to: Optional[date] = Query(None, alias="to", description="По дату (включительно)"),
+        by_cashier: bool = Query(False, description="Разбить по кассирам"),
+        db: AsyncSession = Depends(get_db)
+):
+    """Получить итоги смен по месяцам"""
+    rows = await shift_report_summary_crud.get_monthly(
+        db, location=location, date_from=date_from, date_to=date_to, by_cashier=by_cashier
+    )
+    months = []
+    for row in rows:
+        month = _summary_row(row)
+        month["year"] = int(month["year"])
+        month["month"] = int(month["month"])
+        months.append(month)
+    return {"months": months}
+
+
+def _summary_row(row) -> dict:
+    """Строка итогов с суммами в float, как в остальных ответах API"""
+    data = dict(row._mapping)
+    for field in (*SUMMARY_FIELDS, "cumulative_surplus_shortage"):
+        if data.get(field) is not None:
+            data[field] = float(data[field])
+    return data
+
+
 def _parse_income_entries(income_entries_json: Optional[str]) -> List[IncomeEntry]:
     """Парсит и валидирует записи приходов."""
     income_entries = []
@@ -0,0 +1,76 @@
+# backend/app/api/tasks.py
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import get_db
+from app.services import outbox_dispatcher, task_supervisor
+
+router = APIRouter()
+
+
+@router.get(
+    "",
+    summary="Фоновые задачи",
+    description="Выполняемые и ожидающие очереди фоновые задачи (доставки в Telegram и т.п.), "
+                "последние ошибки и счетчики исходов по типам задач"
+)
+async def get_tasks(
+        kind: Optional[str] = Query(None, description="Фильтр по типу задачи, например telegram_delivery"),
+        failures_limit: int = Query(20, ge=0, le=1000, description="Сколько последних ошибок вернуть")
+):
+    """Получить состояние фоновых задач"""
+    in_flight = task_supervisor.list_in_flight()
+    failures = list(task_supervisor.recent_failures)
+    if kind:
+        in_flight = [task for task in in_flight if task["kind"] == kind]
+        failures = [task for task in failures if task["kind"] == kind]
+
+    return {
+        **task_supervisor.get_metrics(),
+        "in_flight": in_flight,
+        "recent_failures": failures[::-1][:failures_limit],
+        "outbox": outbox_dispatcher.get_metrics(),
+    }
+
+
+@router.get(
+    "/outbox/failed",
+    summary="Недоставленные записи очереди Telegram",
+    description="Записи telegram_outbox в статусе failed: доставка не удалась за максимальное число попыток"
+)
+async def get_failed_outbox(
+        report_type: Optional[str] = Query(None, description="Фильтр по типу отчета, например shift_report"),
+        limit: int = Query(100, ge=1, le=1000, description="Сколько записей вернуть"),
+        db: AsyncSession = Depends(get_db)
+):
+    """Получить недоставленные записи очереди Telegram"""
+    entries = await outbox_dispatcher.list_failed(db, report_type=report_type, limit=limit)
+    return [
+        {
+            "id": entry.id,
+            "report_type": entry.report_type,
+            "report_id": entry.report_id,
+            "attempts": entry.attempts,
+            "last_error": entry.last_error,
+            "created_at": entry.created_at,
+        }
+        for entry in entries
+    ]
+
+
+@router.post(
+    "/outbox/failed/requeue",
+    summary="Повторить доставку недоставленных записей",
+    description="Возвращает записи в статусе failed в очередь со сброшенным счетчиком попыток. "
+                "Без параметров возвращаются все недоставленные записи"
+)
+async def requeue_failed_outbox(
+        ids: Optional[List[int]] = Query(None, description="ID записей telegram_outbox"),
+        report_type: Optional[str] = Query(None, description="Вернуть только записи этого типа отчета"),
+        db: AsyncSession = Depends(get_db)
+):
+    """Вернуть недоставленные записи в очередь доставки"""
+    requeued = await outbox_dispatcher.requeue_failed(db, ids=ids, report_type=report_type)
+    return {"requeued": requeued}
@@ -1,43 +1,55 @@
-from fastapi import APIRouter, Request, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Request, Depends, Header, HTTPException, status
+from fastapi.responses import JSONResponse
 from app.schemas.telegram import TelegramUpdate
-from app.services import TelegramService
-from app.core import get_db
-import json
+from app.services import TelegramService, get_telegram_service, update_queue, update_deduplicator
+from app.core.config import settings
 
 router = APIRouter()
-telegram_service = TelegramService()
 
 
 @router.post("/webhook", summary="Telegram webhook endpoint")
 async def telegram_webhook(
         update: TelegramUpdate,
-        db: AsyncSession = Depends(get_db)
+        secret_token: Optional[str] = Header(None, alias="X-Telegram-Bot-Api-Secret-Token")
 ):
     """
     Обработчик веб-хуков от Telegram.
 
-    Принимает обновления от Telegram API и обрабатывает команды пользователей.
+    Проверяет обновление, ставит его в очередь и сразу отвечает, не дожидаясь
+    ответов пользователю: иначе медленный Telegram API задерживает подтверждение
+    и Telegram начинает повторять доставку.
     """
-    try:
-        # Обрабатываем сообщение
-        if update.message:
-            await telegram_service.handle_message(update.message, db)
-
-        # Обрабатываем callback query (нажатия на inline кнопки)
-        if update.callback_query:
-            await telegram_service.handle_callback_query(update.callback_query, db)
-
-        return {"ok": True}
-
-    except Exception as e:
-        print(f"❌ Ошибка обработки webhook: {str(e)}")
-        # Возвращаем OK чтобы Telegram не повторял запрос
-        return {"ok": True}
+    if settings.WEBHOOK_SECRET_TOKEN and not hmac.compare_digest(
+            secret_token or "", settings.WEBHOOK_SECRET_TOKEN
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Неверный секретный токен веб-хука"
+        )
+
+    if not update_queue.submit(update):
+        # Очередь переполнена - Telegram повторит доставку позже
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"ok": False}
+        )
+
+    return {"ok": True}
+
+
+@router.get("/updates/metrics", summary="Метрики очереди входящих обновлений")
+async def get_update_queue_metrics():
+    """
+    Возвращает глубину очереди обновлений веб-хука, счетчики обработки и отсеянных повторов.
+    """
+    return {**update_queue.get_metrics(), "dedup": update_deduplicator.get_metrics()}
 
 
 @router.get("/webhook/info", summary="Получить информацию о веб-хуке")
-async def get_webhook_info():
+async def get_webhook_info(telegram_service: TelegramService = Depends(get_telegram_service)):
     """
     Получает текущую информацию о настроенном веб-хуке.
     """
@@ -49,7 +61,10 @@ async def get_webhook_info():
 
 
 @router.post("/webhook/set", summary="Установить веб-хук")
-async def set_webhook(request: Request):
+async def set_webhook(
+        request: Request,
+        telegram_service: TelegramService = Depends(get_telegram_service)
+):
     """
     Устанавливает веб-хук для Telegram бота.
     """
@@ -70,7 +85,7 @@ async def set_webhook(request: Request):
 
 
 @router.delete("/webhook", summary="Удалить веб-хук")
-async def delete_webhook():
+async def delete_webhook(telegram_service: TelegramService = Depends(get_telegram_service)):
     """
     Удаляет веб-хук Telegram бота.
     """
@@ -83,4 +98,12 @@ async def delete_webhook():
             return {"success": False, "error": "Не удалось удалить веб-хук"}
 
     except Exception as e:
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/scheduler/metrics", summary="Метрики планировщика отправки")
+async def get_scheduler_metrics(telegram_service: TelegramService = Depends(get_telegram_service)):
+    """
+    Возвращает глубину очереди отправки в Telegram и статистику ожидания.
+    """
+    return telegram_service.scheduler.get_metrics()
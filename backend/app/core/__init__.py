@@ -1,4 +1,5 @@
 from .database import db_helper, get_db
 from .constants import LOCATIONS
+from .http_client import http_helper
 
-__all__ = ["db_helper", "get_db", "LOCATIONS"]
\ No newline at end of file
+__all__ = ["db_helper", "get_db", "LOCATIONS", "http_helper"]
\ No newline at end of file
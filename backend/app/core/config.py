@@ -12,10 +12,13 @@ class Settings(BaseSettings):
     DB_ECHO_POOL: bool = False
     DB_MAX_OVERFLOW: int = 10
     DB_POOL_SIZE: int = 10
+    # Полный URL базы данных; если задан, заменяет DB_DRIVER/DB_HOST/... (например, для бенчмарков)
+    DB_URL: str = ""
 
     # Telegram настройки
     TELEGRAM_BOT_TOKEN: str = ""
     TELEGRAM_CHAT_ID: str = ""
+    TELEGRAM_API_URL: str = "https://api.telegram.org"
 
     # ID тем (подгрупп) в Telegram чате
     KASSA_GAGARINA_48_TOPIC_ID: int = 0
@@ -35,8 +38,85 @@ class Settings(BaseSettings):
     WEBHOOK_URL: str = ""  # Будет установлен автоматически
     WEBHOOK_SECRET_TOKEN: str = ""  # Опционально для безопасности
 
+    # Как API процесс получает обновления Telegram:
+    # "webhook" - веб-хук на WEBHOOK_URL, "polling" - getUpdates в фоне,
+    # "none" - не получает (их забирает отдельный воркер: python -m app.worker)
+    TELEGRAM_UPDATES_MODE: str = "webhook"
+    TELEGRAM_POLLING_TIMEOUT: int = 30  # сек долгого опроса getUpdates
+    TELEGRAM_POLLING_LIMIT: int = 100  # обновлений за запрос
+    TELEGRAM_POLLING_BACKOFF_BASE: float = 1  # сек
+    TELEGRAM_POLLING_BACKOFF_MAX: float = 60  # сек
+
+    # Очередь входящих обновлений Telegram: веб-хук отвечает сразу, обработка в фоне
+    TELEGRAM_UPDATE_QUEUE_SIZE: int = 1000
+    TELEGRAM_UPDATE_WORKERS: int = 4
+    TELEGRAM_UPDATE_TIMEOUT: float = 30  # сек на одно обновление
+    # Защита от повторной доставки обновлений (по update_id)
+    TELEGRAM_UPDATE_DEDUP_SIZE: int = 10000
+    TELEGRAM_UPDATE_DEDUP_TTL: float = 86400  # сек; Telegram хранит недоставленные обновления сутки
+    TELEGRAM_UPDATE_DEDUP_PERSIST: bool = False  # хранить update_id в БД (несколько воркеров, рестарты)
+
+    # Максимальный размер загружаемого фото, байт
+    UPLOAD_MAX_PHOTO_SIZE: int = 20 * 1024 * 1024
+
+    # Облегченные копии фото для Telegram
+    IMAGE_PROCESS_WORKERS: int = 2
+    IMAGE_MAX_SIDE: int = 1600  # px по большей стороне
+    IMAGE_JPEG_QUALITY: int = 82
+
+    # Пул HTTP соединений к Telegram API
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_POOL_LIMIT_PER_HOST: int = 20
+    HTTP_KEEPALIVE_TIMEOUT: float = 60
+    HTTP_DNS_CACHE_TTL: int = 300
+
+    # Лимиты отправки в Telegram (корзины токенов)
+    TELEGRAM_GLOBAL_RATE: float = 25  # сообщений в секунду на бота
+    TELEGRAM_GLOBAL_BURST: float = 30
+    TELEGRAM_GROUP_RATE_PER_MINUTE: float = 20  # сообщений в минуту в одну группу
+    TELEGRAM_GROUP_BURST: float = 3
+    TELEGRAM_PRIVATE_RATE: float = 1  # сообщений в секунду в личный чат
+    TELEGRAM_PRIVATE_BURST: float = 1
+
+    # Повторы запросов к Telegram при сетевых сбоях, 429 и 5xx
+    TELEGRAM_RETRY_MAX_ATTEMPTS: int = 4  # попыток, включая первую
+    TELEGRAM_RETRY_BACKOFF_BASE: float = 0.5  # сек
+    TELEGRAM_RETRY_BACKOFF_MAX: float = 8  # сек
+    TELEGRAM_RETRY_AMBIGUOUS: bool = False  # повторять отправку, которая могла дойти (риск дубля)
+    TELEGRAM_IDEMPOTENCY_CACHE_SIZE: int = 1000
+    TELEGRAM_IDEMPOTENCY_TTL: float = 86400  # сек
+
+    # Как часто проверять, не изменился ли каталог товаров в другом воркере, сек
+    INVENTORY_CATALOG_CHECK_INTERVAL: float = 30
+    # max-age для списка товаров; 0 - браузер всегда переспрашивает с If-None-Match
+    INVENTORY_ITEMS_CACHE_MAX_AGE: int = 0
+
+    # Выгрузка отчетов в CSV/XLSX: сколько отчетов читать из базы за один запрос
+    EXPORT_BATCH_SIZE: int = 500
+
+    # Очередь доставки в Telegram (outbox)
+    OUTBOX_POLL_INTERVAL: float = 5
+    OUTBOX_BATCH_SIZE: int = 20
+    OUTBOX_CONCURRENCY: int = 4
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_BACKOFF_BASE: float = 5
+    OUTBOX_BACKOFF_MAX: float = 600
+    OUTBOX_LEASE_SECONDS: float = 120
+    OUTBOX_DELIVERY_TIMEOUT: float = 90
+
+    # Фоновые задачи (доставки в Telegram и т.п.)
+    BACKGROUND_TASKS_MAX_CONCURRENCY: int = 20  # одновременно выполняемых задач
+    BACKGROUND_TASKS_FAILURE_HISTORY: int = 100  # последних ошибок для /tasks
+
+    # Запуск и остановка приложения
+    STARTUP_WARMUP_TIMEOUT: float = 10  # сек на прогрев пула БД, каталога и HTTP сессии
+    DB_WARMUP_CONNECTIONS: int = 2  # соединений пула, открываемых при запуске
+    SHUTDOWN_DRAIN_TIMEOUT: float = 20  # сек на завершение начатых обработок и доставок
+
     @property
     def db_url(self) -> str:
+        if self.DB_URL:
+            return self.DB_URL
         return f'{self.DB_DRIVER}://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}'
 
     class Config:
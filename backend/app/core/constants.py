@@ -4,3 +4,26 @@ LOCATIONS = [
     "Гайдара Гаджиева 7Б",
     "Абдулхакима Исмаилова 51",
 ]
+
+# Товары старой инвентаризации (DailyInventory): название и поле модели
+DAILY_INVENTORY_DRINKS = [
+    ('IL Primo (стекло)', 'il_primo_steklo'),
+    ('Вода горная', 'voda_gornaya'),
+    ('Добрый сок ПЭТ', 'dobri_sok_pet'),
+    ('Кураговый компот', 'kuragovi_kompot'),
+    ('Напитки ЖБ', 'napitki_jb'),
+    ('Энергетики', 'energetiky'),
+    ('Колд брю', 'kold_bru'),
+    ('Кинза напитки', 'kinza_napitky'),
+]
+DAILY_INVENTORY_FOOD = [
+    ('Палли', 'palli'),
+    ('Барбекю дип', 'barbeku_dip'),
+    ('Булка на шаурму', 'bulka_na_shaurmu'),
+    ('Лаваш', 'lavash'),
+    ('Лепешки', 'lepeshki'),
+    ('Кетчуп дип', 'ketchup_dip'),
+    ('Сырный соус дип', 'sirny_sous_dip'),
+    ('Курица жареная', 'kuriza_jareny'),
+    ('Курица сырая', 'kuriza_siraya'),
+]
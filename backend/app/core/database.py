@@ -1,4 +1,7 @@
+import asyncio
 from typing import AsyncGenerator
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine,
@@ -7,6 +10,7 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from app.core.config import settings
+from app.core.metrics import InstrumentedAsyncPool, instrument_engine
 
 
 class DatabaseHelper:
@@ -35,7 +39,11 @@ class DatabaseHelper:
             echo_pool=echo_pool,
             max_overflow=max_overflow,
             pool_size=pool_size,
+            # Пул измеряет ожидание свободного соединения
+            poolclass=InstrumentedAsyncPool,
         )
+        # Количество и время SQL запросов для /metrics
+        instrument_engine(self.engine)
         self.session_factory = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
@@ -43,6 +51,19 @@ class DatabaseHelper:
             expire_on_commit=False,
         )
 
+    async def warmup(self, connections: int = 1) -> None:
+        """
+        Заранее открывает соединения пула, чтобы первые запросы после запуска
+        не ждали подключения к базе.
+
+        :param connections: Сколько соединений открыть одновременно
+        """
+        async def ping():
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        await asyncio.gather(*(ping() for _ in range(max(1, connections))))
+
     async def dispose(self) -> None:
         """Закрывает все соединения и освобождает ресурсы движка базы данных"""
         await self.engine.dispose()
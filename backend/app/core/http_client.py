@@ -0,0 +1,66 @@
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+from app.core.config import settings
+
+
+class HttpClientHelper:
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 60,
+        dns_cache_ttl: int = 300,
+    ) -> None:
+        """
+        Инициализирует новый экземпляр HttpClientHelper с указанными параметрами пула соединений.
+
+        :param limit: Максимальное количество одновременных соединений в пуле
+        :param limit_per_host: Максимальное количество соединений к одному хосту
+        :param keepalive_timeout: Сколько секунд держать неиспользуемое соединение открытым
+        :param dns_cache_ttl: Время жизни DNS кэша в секундах
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Возвращает общую сессию aiohttp, создавая ее при первом обращении.
+
+        :return: Долгоживущая сессия с пулом keep-alive соединений
+        """
+        if self._session is not None and not self._session.closed:
+            return self._session
+
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                    use_dns_cache=True,
+                )
+                self._session = aiohttp.ClientSession(connector=connector)
+            return self._session
+
+    async def close(self) -> None:
+        """Закрывает общую сессию и все соединения пула"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# Создание экземпляра HttpClientHelper с настройками из конфигурации
+http_helper = HttpClientHelper(
+    limit=settings.HTTP_POOL_LIMIT,
+    limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+    keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+    dns_cache_ttl=settings.HTTP_DNS_CACHE_TTL,
+)
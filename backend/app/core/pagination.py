@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import datetime
+from typing import Literal, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Режимы подсчета total в списках:
+# exact - COUNT(*), estimated - оценка планировщика PostgreSQL (без фильтров), none - не считать
+CountMode = Literal["exact", "estimated", "none"]
+
+# Позиция в списке, отсортированном по (date DESC, id DESC)
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(date: datetime, row_id: int) -> str:
+    """Непрозрачный курсор для следующей страницы"""
+    raw = json.dumps([date.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Разбирает курсор, полученный от encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(date_value), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор пагинации"
+        )
+
+
+def apply_keyset(query, date_column, id_column, cursor: Optional[str], limit: int):
+    """
+    Keyset пагинация по (date DESC, id DESC): вместо OFFSET берутся строки после
+    последней строки предыдущей страницы. Запрашивает limit + 1 строк, чтобы
+    понять, есть ли следующая страница (см. split_page).
+    """
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(date_column, id_column) < tuple_(cursor_date, cursor_id))
+
+    return query.order_by(date_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def split_page(rows, limit: int):
+    """Отрезает лишнюю строку и возвращает (строки страницы, курсор следующей страницы)"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.date, last.id)
+
+
+async def count_rows(db: AsyncSession, query, table_name: str, filtered: bool, mode: CountMode) -> Optional[int]:
+    """
+    Количество строк запроса query.
+
+    В режиме estimated для запроса без фильтров берется оценка reltuples из pg_class
+    (мгновенно, но приблизительно); с фильтрами или на другой СУБД - точный COUNT(*).
+    """
+    if mode == "none":
+        return None
+
+    if mode == "estimated" and not filtered and db.bind.dialect.name == "postgresql":
+        result = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+            {"table_name": table_name}
+        )
+        estimate = result.scalar()
+        # -1 или 0: таблица еще не анализировалась
+        if estimate is not None and estimate > 0:
+            return estimate
+
+    result = await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    return result.scalar_one()
@@ -1,5 +1,6 @@
 # backend/app/crud/__init__.py
 from .shift_report import ShiftReportCRUD
+from .shift_report_summary import ShiftReportSummaryCRUD
 from .daily_inventory import DailyInventoryCrud
 from .report_on_good import ReportOnGoodCRUD
 from .writeoff_transfer import WriteoffTransferCRUD
@@ -8,6 +9,7 @@ from .daily_inventory_v2 import DailyInventoryV2CRUD
 
 __all__ = [
     'ShiftReportCRUD',
+    'ShiftReportSummaryCRUD',
     'DailyInventoryCrud',
     'ReportOnGoodCRUD',
     'WriteoffTransferCRUD',
@@ -1,25 +1,29 @@
 # backend/app/crud/daily_inventory_v2.py
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, insert, delete, union_all, literal_column, cast, true, and_, Numeric
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
 from zoneinfo import ZoneInfo
-import asyncio
 
+from app.core.pagination import CountMode, apply_keyset, split_page, count_rows
 from app.models.daily_inventory_v2 import DailyInventoryV2
+from app.models.daily_inventory_v2_line import DailyInventoryV2Line
 from app.models.inventory_item import InventoryItem
+from app.models.report_on_goods import ReportOnGoods
+from app.models.writeoff_transfer import WriteoffTransfer
+from app.models.types import json_array_length, json_contains, json_array_elements, json_field
 from app.schemas.daily_inventory_v2 import DailyInventoryV2Create
-from app.services import TelegramService
+from app.services import TelegramService, get_telegram_service, outbox_dispatcher, inventory_catalog
 
 
 class DailyInventoryV2CRUD:
     """CRUD операции для новой инвентаризации"""
 
-    def __init__(self):
+    def __init__(self, telegram_service: Optional[TelegramService] = None):
         try:
-            self.telegram_service = TelegramService()
+            self.telegram_service = telegram_service or get_telegram_service()
         except Exception as e:
             print(f"⚠️  Ошибка инициализации Telegram сервиса: {str(e)}")
             self.telegram_service = None
@@ -31,23 +35,15 @@ class DailyInventoryV2CRUD:
     ) -> DailyInventoryV2:
         """Создать новую инвентаризацию с отправкой в Telegram"""
         try:
-            # Проверяем, что все товары существуют
+            # Проверяем по каталогу в памяти, что все товары существуют
             item_ids = [entry.item_id for entry in inventory_data.inventory_data]
             if item_ids:
-                result = await db.execute(
-                    select(InventoryItem.id)
-                    .where(
-                        InventoryItem.id.in_(item_ids),
-                        InventoryItem.is_active == True
-                    )
-                )
-                existing_ids = {row[0] for row in result.fetchall()}
-                missing_ids = set(item_ids) - existing_ids
+                missing_ids = await inventory_catalog.get_missing_ids(item_ids)
 
                 if missing_ids:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Товары с ID {list(missing_ids)} не найдены или неактивны"
+                        detail=f"Товары с ID {missing_ids} не найдены или неактивны"
                     )
 
             # Преобразуем данные в JSON формат
@@ -71,15 +67,25 @@ class DailyInventoryV2CRUD:
                 inventory_data=inventory_json
             )
 
+            # Сохраняем инвентаризацию, ее строки и задачу доставки в Telegram в одной транзакции
             db.add(db_inventory)
+            await db.flush()
+
+            # Строки по товарам - одним INSERT на все товары
+            if inventory_json:
+                await db.execute(
+                    insert(DailyInventoryV2Line),
+                    [{"inventory_id": db_inventory.id, **entry} for entry in inventory_json]
+                )
+
+            outbox_dispatcher.enqueue(db, "daily_inventory_v2", db_inventory.id)
             await db.commit()
             await db.refresh(db_inventory)
 
             print(f"✅ Инвентаризация v2 создана с ID: {db_inventory.id}")
 
-            # Запускаем отправку в Telegram в фоне
-            if self.telegram_service:
-                asyncio.create_task(self._send_to_telegram_background(db_inventory.id))
+            # Будим диспетчер очереди доставки
+            outbox_dispatcher.notify()
 
             return db_inventory
 
@@ -93,46 +99,27 @@ class DailyInventoryV2CRUD:
                 detail=f"Ошибка создания инвентаризации: {str(e)}"
             )
 
-    async def _send_to_telegram_background(self, inventory_id: int):
+    async def deliver_to_telegram(self, inventory_id: int, payload: Dict[str, Any]) -> bool:
         """
-        Фоновая отправка отчета инвентаризации v2 в Telegram.
+        Отправляет отчет инвентаризации v2 в Telegram из очереди доставки.
         """
         from ..core import db_helper
 
-        try:
-            # Создаем новую сессию БД для фоновой задачи
-            async with db_helper.session_factory() as db_session:
-                try:
-                    # Получаем детальную информацию об инвентаризации
-                    detailed_inventory = await self.get_inventory_with_items(db_session, inventory_id)
-
-                    if not detailed_inventory:
-                        print(f"⚠️  Инвентаризация v2 с ID {inventory_id} не найдена для отправки в Telegram")
-                        return
-
-                    # Отправляем в Telegram (с таймаутом)
-                    telegram_success = await asyncio.wait_for(
-                        self.telegram_service.send_daily_inventory_v2_report(detailed_inventory),
-                        timeout=30  # 30 секунд таймаут
-                    )
+        if not self.telegram_service:
+            return False
 
-                    if telegram_success:
-                        print(
-                            f"✅ Инвентаризация v2 ID {inventory_id} отправлена в Telegram для локации: {detailed_inventory['location']}")
-                    else:
-                        print(
-                            f"⚠️  Инвентаризация v2 ID {inventory_id} создана, но не отправлена в Telegram для локации: {detailed_inventory['location']}")
+        # Создаем новую сессию БД для фоновой задачи
+        async with db_helper.session_factory() as db_session:
+            # Получаем детальную информацию об инвентаризации
+            detailed_inventory = await self.get_inventory_with_items(db_session, inventory_id)
 
-                except asyncio.TimeoutError:
-                    print(f"⏰ Таймаут при отправке инвентаризации v2 ID {inventory_id} в Telegram")
-                except Exception as telegram_error:
-                    print(
-                        f"⚠️  Ошибка отправки инвентаризации v2 ID {inventory_id} в Telegram: {str(telegram_error)}")
+        if not detailed_inventory:
+            print(f"⚠️  Инвентаризация v2 с ID {inventory_id} не найдена для отправки в Telegram")
+            return True
 
-        except Exception as e:
-            print(
-                f"⚠️  Критическая ошибка в фоновой отправке Telegram для инвентаризации v2 ID {inventory_id}: {str(e)}"
-            )
+        return await self.telegram_service.send_daily_inventory_v2_report(
+            detailed_inventory, idempotency_key=payload.get("idempotency_key")
+        )
 
     async def get_inventory_with_items(
             self,
@@ -150,13 +137,9 @@ class DailyInventoryV2CRUD:
             if not inventory:
                 return None
 
-            # Получаем информацию о товарах
+            # Информация о товарах берется из каталога в памяти
             if inventory.inventory_data:
-                item_ids = [entry["item_id"] for entry in inventory.inventory_data]
-                items_result = await db.execute(
-                    select(InventoryItem).where(InventoryItem.id.in_(item_ids))
-                )
-                items = {item.id: item for item in items_result.scalars().all()}
+                items = await inventory_catalog.get_items()
 
                 # Объединяем данные
                 detailed_data = []
@@ -202,36 +185,59 @@ class DailyInventoryV2CRUD:
             db: AsyncSession,
             location: Optional[str] = None,
             shift_type: Optional[str] = None,
+            item_id: Optional[int] = None,
             skip: int = 0,
-            limit: int = 100
-    ) -> tuple[List[DailyInventoryV2], int]:
-        """Получить список инвентаризаций с фильтрацией"""
+            limit: int = 100,
+            cursor: Optional[str] = None,
+            count_mode: CountMode = "exact"
+    ) -> tuple[List[Any], Optional[int], Optional[str]]:
+        """
+        Получить список инвентаризаций с фильтрацией.
+
+        Страницы выбираются по курсору (date, id); skip оставлен для старых клиентов
+        и используется только без курсора. Загружаются только поля списка:
+        количество товаров считается в БД, без чтения inventory_data.
+
+        :return: (строки, всего записей или None, курсор следующей страницы)
+        """
         try:
             # Базовый запрос
-            query = select(DailyInventoryV2)
-            count_query = select(DailyInventoryV2).count()
+            query = select(
+                DailyInventoryV2.id,
+                DailyInventoryV2.location,
+                DailyInventoryV2.shift_type,
+                DailyInventoryV2.cashier_name,
+                DailyInventoryV2.date,
+                func.coalesce(json_array_length(DailyInventoryV2.inventory_data), 0).label("items_count"),
+                DailyInventoryV2.created_at,
+                DailyInventoryV2.updated_at,
+            )
 
             # Применяем фильтры
             if location:
                 query = query.where(DailyInventoryV2.location == location)
-                count_query = count_query.where(DailyInventoryV2.location == location)
 
             if shift_type:
                 query = query.where(DailyInventoryV2.shift_type == shift_type)
-                count_query = count_query.where(DailyInventoryV2.shift_type == shift_type)
 
-            # Сортировка и пагинация
-            query = query.order_by(DailyInventoryV2.date.desc())
-            query = query.offset(skip).limit(limit)
+            # Инвентаризации, где есть товар (GIN индекс по inventory_data)
+            if item_id is not None:
+                query = query.where(json_contains(DailyInventoryV2.inventory_data, {"item_id": item_id}))
+
+            total = await count_rows(
+                db, query, DailyInventoryV2.__tablename__,
+                filtered=bool(location or shift_type or item_id is not None), mode=count_mode
+            )
 
-            # Выполняем запросы
-            result = await db.execute(query)
-            count_result = await db.execute(count_query)
+            # Сортировка и пагинация
+            page_query = apply_keyset(query, DailyInventoryV2.date, DailyInventoryV2.id, cursor, limit)
+            if skip and not cursor:
+                page_query = page_query.offset(skip)
 
-            inventories = result.scalars().all()
-            total = count_result.scalar()
+            result = await db.execute(page_query)
+            inventories, next_cursor = split_page(result.all(), limit)
 
-            return list(inventories), total
+            return inventories, total, next_cursor
 
         except SQLAlchemyError as e:
             raise HTTPException(
@@ -239,6 +245,205 @@ class DailyInventoryV2CRUD:
                 detail=f"Ошибка получения списка инвентаризаций: {str(e)}"
             )
 
+    async def get_item_history(
+            self,
+            db: AsyncSession,
+            item_id: int,
+            location: Optional[str] = None,
+            date_from: Optional[datetime] = None,
+            date_to: Optional[datetime] = None
+    ) -> List[Any]:
+        """История остатков товара по инвентаризациям (по строкам, без разбора JSON)"""
+        try:
+            query = (
+                select(
+                    DailyInventoryV2.id.label("inventory_id"),
+                    DailyInventoryV2.location,
+                    DailyInventoryV2.shift_type,
+                    DailyInventoryV2.date,
+                    DailyInventoryV2Line.quantity,
+                )
+                .join(DailyInventoryV2, DailyInventoryV2.id == DailyInventoryV2Line.inventory_id)
+                .where(DailyInventoryV2Line.item_id == item_id)
+            )
+
+            if location:
+                query = query.where(DailyInventoryV2.location == location)
+            if date_from:
+                query = query.where(DailyInventoryV2.date >= date_from)
+            if date_to:
+                query = query.where(DailyInventoryV2.date < date_to)
+
+            result = await db.execute(query.order_by(DailyInventoryV2.date, DailyInventoryV2.id))
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Ошибка получения истории товара: {str(e)}"
+            )
+
+    @staticmethod
+    def _movements_query(location: Optional[str], date_after, date_to: datetime):
+        """
+        Движения товаров по названию: приемки (ReportOnGoods) и списания/перемещения
+        (WriteoffTransfer) - по одной строке на позицию отчета в периоде (date_after, date_to).
+        """
+        def entries(table, column, date_column, quantity_key: str, kind: str):
+            entry = json_array_elements(column).table_valued("value").alias(f"{column.name}_entry")
+            quantity = cast(json_field(entry.c.value, quantity_key), Numeric)
+            zero = literal_column("0", Numeric)
+            query = (
+                select(
+                    table.location.label("location"),
+                    date_column.label("date"),
+                    func.lower(func.trim(json_field(entry.c.value, "name"))).label("name"),
+                    (quantity if kind == "received" else zero).label("received"),
+                    (quantity if kind == "written_off" else zero).label("written_off"),
+                    (quantity if kind == "transferred" else zero).label("transferred"),
+                )
+                .select_from(table)
+                .join(entry, true())
+                .where(date_column > date_after, date_column < date_to)
+            )
+            if location:
+                query = query.where(table.location == location)
+            return query
+
+        writeoff_date = func.coalesce(WriteoffTransfer.date, WriteoffTransfer.created_date)
+        return union_all(
+            entries(ReportOnGoods, ReportOnGoods.kuxnya, ReportOnGoods.date, "count", "received"),
+            entries(ReportOnGoods, ReportOnGoods.bar, ReportOnGoods.date, "count", "received"),
+            entries(ReportOnGoods, ReportOnGoods.upakovki_xoz, ReportOnGoods.date, "count", "received"),
+            entries(WriteoffTransfer, WriteoffTransfer.writeoffs, writeoff_date, "weight", "written_off"),
+            entries(WriteoffTransfer, WriteoffTransfer.transfers, writeoff_date, "weight", "transferred"),
+        )
+
+    @staticmethod
+    def _history_start_query(location: Optional[str], date_from: datetime):
+        """
+        Дата, с которой нужна история для расчета расхода: последняя инвентаризация
+        перед date_from (для всех точек - самая ранняя из последних по каждой точке)
+        """
+        last_before = (
+            select(func.max(DailyInventoryV2.date).label("date"))
+            .where(DailyInventoryV2.date < date_from)
+            .group_by(DailyInventoryV2.location)
+        )
+        if location:
+            last_before = last_before.where(DailyInventoryV2.location == location)
+        last_before = last_before.subquery()
+        return select(func.min(last_before.c.date))
+
+    def _consumption_query(
+            self,
+            location: Optional[str],
+            date_from: datetime,
+            date_to: datetime,
+            history_from: datetime
+    ):
+        """
+        Расход товаров между соседними инвентаризациями одной точки:
+        расход = предыдущий остаток + приход - списания - перемещения - текущий остаток.
+
+        Предыдущий остаток берется оконной функцией LAG по (товар, точка) в порядке даты,
+        приход и списания - за период (предыдущая инвентаризация, текущая], по совпадению
+        названия позиции с названием товара без учета регистра.
+
+        История читается только начиная с history_from - последней инвентаризации перед
+        date_from (см. _history_start_query), а не за все время. Поэтому товар,
+        которого не было в той инвентаризации, получает расход только со второго
+        пересчета в периоде.
+
+        Ограничение: в приемках и списаниях нет item_id, только название позиции, поэтому
+        после переименования товара в каталоге его движения под старым названием
+        в расчет не попадают.
+        """
+        window = {
+            "partition_by": (DailyInventoryV2Line.item_id, DailyInventoryV2.location),
+            "order_by": (DailyInventoryV2.date, DailyInventoryV2.id),
+        }
+        counts_query = (
+            select(
+                DailyInventoryV2Line.item_id,
+                DailyInventoryV2.location,
+                DailyInventoryV2.id.label("inventory_id"),
+                DailyInventoryV2.shift_type,
+                DailyInventoryV2.date,
+                DailyInventoryV2Line.quantity,
+                func.lag(DailyInventoryV2Line.quantity).over(**window).label("prev_quantity"),
+                func.lag(DailyInventoryV2.date).over(**window).label("prev_date"),
+            )
+            .join(DailyInventoryV2, DailyInventoryV2.id == DailyInventoryV2Line.inventory_id)
+            # Предыдущий остаток может быть раньше date_from - история с последней инвентаризации до него
+            .where(DailyInventoryV2.date >= history_from, DailyInventoryV2.date < date_to)
+        )
+        if location:
+            counts_query = counts_query.where(DailyInventoryV2.location == location)
+
+        counts = counts_query.cte("counts")
+        movements = self._movements_query(location, history_from, date_to).cte("movements")
+
+        received = func.coalesce(func.sum(movements.c.received), 0)
+        written_off = func.coalesce(func.sum(movements.c.written_off), 0)
+        transferred = func.coalesce(func.sum(movements.c.transferred), 0)
+
+        return (
+            select(
+                counts.c.item_id,
+                InventoryItem.name.label("item_name"),
+                InventoryItem.unit.label("item_unit"),
+                counts.c.location,
+                counts.c.inventory_id,
+                counts.c.shift_type,
+                counts.c.prev_date,
+                counts.c.date,
+                counts.c.prev_quantity,
+                counts.c.quantity,
+                received.label("received"),
+                written_off.label("written_off"),
+                transferred.label("transferred"),
+                (counts.c.prev_quantity + received - written_off - transferred - counts.c.quantity).label("consumed"),
+            )
+            .join(InventoryItem, InventoryItem.id == counts.c.item_id)
+            .outerjoin(movements, and_(
+                movements.c.location == counts.c.location,
+                movements.c.name == func.lower(InventoryItem.name),
+                movements.c.date > counts.c.prev_date,
+                movements.c.date <= counts.c.date,
+            ))
+            .where(counts.c.date >= date_from, counts.c.prev_quantity.is_not(None))
+            .group_by(
+                counts.c.item_id, InventoryItem.name, InventoryItem.unit, counts.c.location,
+                counts.c.inventory_id, counts.c.shift_type, counts.c.prev_date, counts.c.date,
+                counts.c.prev_quantity, counts.c.quantity,
+            )
+            .order_by(counts.c.location, counts.c.item_id, counts.c.date)
+        )
+
+    async def stream_consumption(
+            self,
+            location: Optional[str],
+            date_from: datetime,
+            date_to: datetime
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Построчно отдает расход товаров за период (см. _consumption_query).
+        Строки читаются из БД порциями, весь результат в памяти не собирается.
+        """
+        from ..core import db_helper
+
+        # Отдельная сессия: генератор работает, пока ответ отправляется клиенту
+        async with db_helper.session_factory() as db_session:
+            # Если раньше инвентаризаций не было, предыдущего остатка нет ни у одной строки периода
+            history_from = await db_session.scalar(self._history_start_query(location, date_from)) or date_from
+
+            result = await db_session.stream(
+                self._consumption_query(location, date_from, date_to, history_from).execution_options(yield_per=500)
+            )
+            async for row in result.mappings():
+                yield dict(row)
+
     async def delete_inventory(self, db: AsyncSession, inventory_id: int) -> bool:
         """Удалить инвентаризацию"""
         try:
@@ -250,6 +455,10 @@ class DailyInventoryV2CRUD:
             if not inventory:
                 return False
 
+            # Строки удаляются каскадом в БД, явно - для СУБД без внешних ключей (SQLite)
+            await db.execute(
+                delete(DailyInventoryV2Line).where(DailyInventoryV2Line.inventory_id == inventory_id)
+            )
             await db.delete(inventory)
             await db.commit()
 
@@ -1,4 +1,4 @@
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from fastapi import HTTPException, status
 from datetime import datetime
@@ -7,6 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.inventory_item import InventoryItem
 from app.schemas.inventory_item import InventoryItemCreate, InventoryItemUpdate
+from app.services import inventory_catalog
+from app.services.inventory_catalog import CatalogItem
 
 
 class InventoryItemCRUD:
@@ -28,6 +30,7 @@ class InventoryItemCRUD:
             db.add(db_item)
             await db.commit()
             await db.refresh(db_item)
+            inventory_catalog.invalidate()
 
             print(f"✅ Товар создан: {db_item.name}")
             return db_item
@@ -60,41 +63,22 @@ class InventoryItemCRUD:
 
     async def get_items(
             self,
-            db: AsyncSession,
             is_active: Optional[bool] = None,
             skip: int = 0,
             limit: int = 100
-    ) -> tuple[List[InventoryItem], int]:
-        """Получить список товаров с фильтрацией"""
+    ) -> tuple[List[CatalogItem], int]:
+        """Получить список товаров с фильтрацией (из кэша каталога)"""
         try:
-            # Базовый запрос
-            query = select(InventoryItem)
-            count_query = select(func.count(InventoryItem.id))
-
-            # Применяем фильтры
-            if is_active is not None:
-                query = query.where(InventoryItem.is_active == is_active)
-                count_query = count_query.where(InventoryItem.is_active == is_active)
-
-            # Сортировка и пагинация
-            query = query.order_by(InventoryItem.name)
-            query = query.offset(skip).limit(limit)
-
-            # Выполняем запросы
-            result = await db.execute(query)
-            count_result = await db.execute(count_query)
-
-            items = result.scalars().all()
-            total = count_result.scalar()
-
-            return list(items), total
-
+            # Запрос к БД выполняется только при перезагрузке каталога
+            items = await inventory_catalog.list_items(is_active=is_active)
         except SQLAlchemyError as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Ошибка получения списка товаров: {str(e)}"
             )
 
+        return items[skip:skip + limit], len(items)
+
     async def update_item(
             self,
             db: AsyncSession,
@@ -119,6 +103,7 @@ class InventoryItemCRUD:
             db_item.updated_at = datetime.utcnow()
             await db.commit()
             await db.refresh(db_item)
+            inventory_catalog.invalidate()
 
             print(f"✅ Товар обновлен: {db_item.name}")
             return db_item
@@ -152,6 +137,7 @@ class InventoryItemCRUD:
             db_item.updated_at = datetime.utcnow()
 
             await db.commit()
+            inventory_catalog.invalidate()
 
             print(f"✅ Товар деактивирован: {db_item.name}")
             return True
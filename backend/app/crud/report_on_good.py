@@ -1,22 +1,33 @@
-from typing import Dict, List, Any
+import asyncio
+from pathlib import Path
+from typing import Dict, List, Any, Optional
 
-from fastapi import HTTPException
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas import ReportOnGoodsCreate
 from app.models import ReportOnGoods
-from app.services import TelegramService
+from app.services import TelegramService, get_telegram_service, image_service, outbox_dispatcher
+from app.services import FileService
 from datetime import datetime
 
 class ReportOnGoodCRUD:
-    def __init__(self):
-        self.telegram_service = TelegramService()
+    def __init__(self, telegram_service: Optional[TelegramService] = None):
+        self.telegram_service = telegram_service or get_telegram_service()
+        self.file_service = FileService()
 
     async def create_report_on_good(
             self,
             db: AsyncSession,
             report_data: ReportOnGoodsCreate,
-            photos: List[Dict[str, Any]]
+            photos: List[UploadFile]
     ):
+        """
+        Создает отчет приема товаров. Фото сохраняются на диск, а отправка в Telegram
+        идет через очередь доставки и не задерживает ответ.
+        """
+        photo_paths = await self.file_service.save_goods_report_photos(photos or [])
+
         kuxnya_dict = []
         for kux in report_data.kuxnya:
             kuxnya_dict.append({
@@ -48,32 +59,67 @@ class ReportOnGoodCRUD:
             kuxnya=kuxnya_dict,
             bar=bar_dict,
             upakovki_xoz=upakovki_dict,
+            photo_paths=photo_paths,
         )
 
-        db.add(db_report)
-        await db.commit()
-        await db.refresh(db_report)
-
-        # Отправляем в Telegram
         try:
-            report_dict = {
-                'location': db_report.location,
-                'cashier_name': db_report.cashier_name,
-                'shift_type': db_report.shift_type,
-                'kuxnya': db_report.kuxnya,
-                'bar': db_report.bar,
-                'upakovki_xoz': db_report.upakovki_xoz,
-            }
-
-            await self.telegram_service.send_goods_report(report_dict, photos=photos)
+            # Сохраняем отчет и задачу доставки в Telegram в одной транзакции
+            db.add(db_report)
+            await db.flush()
+            outbox_dispatcher.enqueue(db, "report_on_goods", db_report.id)
+            await db.commit()
+            await db.refresh(db_report)
+        except Exception:
+            await db.rollback()
+            # Отчет не сохранен - фото больше никому не нужны
+            await self.file_service.delete_goods_report_photos(photo_paths)
+            raise
 
-        except Exception as e:
-            print(f"Ошибка отправки отчета товаров в Telegram: {str(e)}")
+        outbox_dispatcher.notify()
 
         return db_report
 
+    async def deliver_to_telegram(self, report_id: int, payload: Dict[str, Any]) -> bool:
+        """
+        Отправляет отчет приема товаров в Telegram из очереди доставки, используя новую сессию БД.
+        Фото читаются с диска, в Telegram уходят их облегченные копии.
+        """
+        from ..core import db_helper
+
+        async with db_helper.session_factory() as db_session:
+            result = await db_session.execute(
+                select(ReportOnGoods).where(ReportOnGoods.id == report_id)
+            )
+            db_report = result.scalar_one_or_none()
+
+        if not db_report:
+            # Отчет удален - доставлять нечего
+            print(f"⚠️  Отчет приема товаров с ID {report_id} не найден для отправки в Telegram")
+            return True
+
+        report_dict = {
+            'location': db_report.location,
+            'cashier_name': db_report.cashier_name,
+            'shift_type': db_report.shift_type,
+            'kuxnya': db_report.kuxnya,
+            'bar': db_report.bar,
+            'upakovki_xoz': db_report.upakovki_xoz,
+        }
+
+        photos = []
+        for photo_path in db_report.photo_paths or []:
+            if not await asyncio.to_thread(Path(photo_path).exists):
+                print(f"⚠️  Фото отчета приема товаров не найдено: {photo_path}")
+                continue
+            photos.append({'path': await image_service.ensure_derivative(photo_path)})
+
+        return await self.telegram_service.send_goods_report(
+            report_dict, photos=photos, idempotency_key=payload.get("idempotency_key")
+        )
+
     async def send_photo(self, location: str, photos: List[Dict[str, Any]]):
         try:
+            photos = await image_service.downscale_photos(photos)
             return await self.telegram_service.send_photos_to_location(location=location, photos=photos)
         except Exception as e:
             raise HTTPException(status_code=401, detail=str(e))
\ No newline at end of file
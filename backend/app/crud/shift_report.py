@@ -4,20 +4,21 @@ from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from app.models import ShiftReport
 from app.schemas import ShiftReportCreate
-from app.services import ReportCalculator, TelegramService
+from app.services import ReportCalculator, TelegramService, get_telegram_service, outbox_dispatcher, image_service
 from app.services import FileService
-from typing import Optional
-import asyncio
+from app.crud.shift_report_summary import shift_report_summary_crud
+from app.core.pagination import CountMode, apply_keyset, split_page, count_rows
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
 class ShiftReportCRUD:
-    def __init__(self):
+    def __init__(self, telegram_service: Optional[TelegramService] = None):
         self.calculator = ReportCalculator()
         self.file_service = FileService()
         # Инициализация TelegramService в try-catch
         try:
-            self.telegram_service = TelegramService()
+            self.telegram_service = telegram_service or get_telegram_service()
         except Exception as e:
             print(f"⚠️  Ошибка инициализации Telegram сервиса: {str(e)}")
             self.telegram_service = None
@@ -30,14 +31,13 @@ class ShiftReportCRUD:
     ) -> ShiftReport:
         """
         Создает новый отчет завершения смены с расчетами.
-        Telegram отправка происходит асинхронно и не влияет на создание записи.
+        Telegram отправка идет через очередь доставки и не влияет на создание записи.
         """
-        # Создаем отчет в базе данных
+        # Создаем отчет в базе данных (вместе с записью в очереди доставки)
         db_report = await self._create_report_in_db_safe(db, report_data, photo)
 
-        # Запускаем отправку в Telegram в фоне (не ждем результата)
-        if self.telegram_service and db_report:
-            asyncio.create_task(self._send_to_telegram_background(db_report.id))
+        # Будим диспетчер очереди, чтобы отчет ушел в Telegram без ожидания опроса
+        outbox_dispatcher.notify()
 
         return db_report
 
@@ -58,7 +58,7 @@ class ShiftReportCRUD:
             date = datetime.now(ZoneInfo("UTC")).astimezone(ZoneInfo("Europe/Moscow"))
 
             # Сохраняем фото
-            photo_path = self.file_service.save_shift_report_photo(photo)
+            photo_path = await self.file_service.save_shift_report_photo(photo)
 
             # Рассчитываем сверку (ОБНОВЛЕНО: добавлены новые поля)
             calculations = self.calculator.calculate_shift_report(
@@ -117,8 +117,11 @@ class ShiftReportCRUD:
                 status="draft"
             )
 
-            # Сохраняем отчет в базу данных
+            # Сохраняем отчет, дневные итоги и задачу доставки в Telegram в одной транзакции
             db.add(db_report)
+            await db.flush()
+            await shift_report_summary_crud.add_report(db, db_report)
+            outbox_dispatcher.enqueue(db, "shift_report", db_report.id)
             await db.commit()
             await db.refresh(db_report)
 
@@ -134,73 +137,69 @@ class ShiftReportCRUD:
             await db.rollback()
             raise e
 
-    async def _send_to_telegram_background(self, report_id: int):
+    async def deliver_to_telegram(self, report_id: int, payload: Dict[str, Any]) -> bool:
         """
-        Фоновая отправка отчета в Telegram с использованием новой сессии БД.
+        Отправляет отчет в Telegram из очереди доставки, используя новую сессию БД.
         """
         from ..core import db_helper
 
-        try:
-            # Создаем новую сессию БД для фоновой задачи
-            async with db_helper.session_factory() as db_session:
-                try:
-                    # Получаем отчет из БД
-                    result = await db_session.execute(
-                        select(ShiftReport).where(ShiftReport.id == report_id)
-                    )
-                    db_report = result.scalar_one_or_none()
-
-                    if not db_report:
-                        print(f"⚠️  Отчет с ID {report_id} не найден для отправки в Telegram")
-                        return
-
-                    # Подготавливаем данные для отправки (ОБНОВЛЕНО: добавлены новые поля)
-                    report_dict = {
-                        'location': db_report.location,
-                        'cashier_name': db_report.cashier_name,
-                        'shift_type': db_report.shift_type,
-                        'date': db_report.date,
-                        'total_revenue': float(db_report.total_revenue),
-                        'returns': float(db_report.returns),
-                        'acquiring': float(db_report.acquiring),
-                        'qr_code': float(db_report.qr_code),
-                        'online_app': float(db_report.online_app),
-                        'yandex_food': float(db_report.yandex_food),
-                        'yandex_food_no_system': float(db_report.yandex_food_no_system),  # НОВОЕ ПОЛЕ
-                        'primehill': float(db_report.primehill),  # НОВОЕ ПОЛЕ
-                        'total_acquiring': float(db_report.total_acquiring),
-                        'income_entries': db_report.income_entries,
-                        'total_income': float(db_report.total_income),
-                        'expense_entries': db_report.expense_entries,
-                        'total_expenses': float(db_report.total_expenses),
-                        'calculated_amount': float(db_report.calculated_amount),
-                        'fact_cash': float(db_report.fact_cash),
-                        'surplus_shortage': float(db_report.surplus_shortage),
-                        "comments": db_report.comments
-                    }
-
-                    # Отправляем в Telegram (с таймаутом)
-                    telegram_success = await asyncio.wait_for(
-                        self.telegram_service.send_shift_report(report_dict, db_report.photo_path),
-                        timeout=30  # 30 секунд таймаут
-                    )
-
-                    # Обновляем статус в новой транзакции
-                    if telegram_success:
-                        db_report.status = "sent"
-                        await db_session.commit()
-                        print(f"✅ Отчет смены ID {report_id} отправлен в Telegram для локации: {db_report.location}")
-                    else:
-                        print(
-                            f"⚠️  Отчет смены ID {report_id} создан, но не отправлен в Telegram для локации: {db_report.location}")
-
-                except asyncio.TimeoutError:
-                    print(f"⏰ Таймаут при отправке отчета ID {report_id} в Telegram")
-                except Exception as telegram_error:
-                    print(f"⚠️  Ошибка отправки отчета ID {report_id} в Telegram: {str(telegram_error)}")
+        if not self.telegram_service:
+            return False
 
-        except Exception as e:
-            print(f"⚠️  Критическая ошибка в фоновой отправке Telegram для отчета ID {report_id}: {str(e)}")
+        async with db_helper.session_factory() as db_session:
+            # Получаем отчет из БД
+            result = await db_session.execute(
+                select(ShiftReport).where(ShiftReport.id == report_id)
+            )
+            db_report = result.scalar_one_or_none()
+
+            if not db_report:
+                # Отчет удален - доставлять нечего
+                print(f"⚠️  Отчет с ID {report_id} не найден для отправки в Telegram")
+                return True
+
+            if db_report.status == "sent":
+                return True
+
+            # Подготавливаем данные для отправки (ОБНОВЛЕНО: добавлены новые поля)
+            report_dict = {
+                'location': db_report.location,
+                'cashier_name': db_report.cashier_name,
+                'shift_type': db_report.shift_type,
+                'date': db_report.date,
+                'total_revenue': float(db_report.total_revenue),
+                'returns': float(db_report.returns),
+                'acquiring': float(db_report.acquiring),
+                'qr_code': float(db_report.qr_code),
+                'online_app': float(db_report.online_app),
+                'yandex_food': float(db_report.yandex_food),
+                'yandex_food_no_system': float(db_report.yandex_food_no_system),  # НОВОЕ ПОЛЕ
+                'primehill': float(db_report.primehill),  # НОВОЕ ПОЛЕ
+                'total_acquiring': float(db_report.total_acquiring),
+                'income_entries': db_report.income_entries,
+                'total_income': float(db_report.total_income),
+                'expense_entries': db_report.expense_entries,
+                'total_expenses': float(db_report.total_expenses),
+                'calculated_amount': float(db_report.calculated_amount),
+                'fact_cash': float(db_report.fact_cash),
+                'surplus_shortage': float(db_report.surplus_shortage),
+                "comments": db_report.comments
+            }
+
+            # В Telegram отправляем облегченную копию, оригинал остается в хранилище
+            photo_path = await image_service.ensure_derivative(db_report.photo_path)
+
+            telegram_success = await self.telegram_service.send_shift_report(
+                report_dict, photo_path, idempotency_key=payload.get("idempotency_key")
+            )
+
+            # Обновляем статус в новой транзакции
+            if telegram_success:
+                db_report.status = "sent"
+                await db_session.commit()
+                print(f"✅ Отчет смены ID {report_id} отправлен в Telegram для локации: {db_report.location}")
+
+            return telegram_success
 
     async def get_shift_report(
             self,
@@ -219,6 +218,70 @@ class ShiftReportCRUD:
             await db.rollback()
             raise e
 
+    async def get_shift_reports(
+            self,
+            db: AsyncSession,
+            location: Optional[str] = None,
+            cashier_name: Optional[str] = None,
+            date_from: Optional[datetime] = None,
+            date_to: Optional[datetime] = None,
+            status: Optional[str] = None,
+            cursor: Optional[str] = None,
+            limit: int = 50,
+            include_entries: bool = False,
+            include_comments: bool = False,
+            count_mode: CountMode = "exact"
+    ) -> tuple[List[Any], Optional[int], Optional[str]]:
+        """
+        Страница отчетов по курсору (date, id) от новых к старым.
+        Загружаются только нужные колонки: списки приходов/расходов и комментарий -
+        по запросу, путь к фото - никогда.
+
+        :return: (строки, всего отчетов или None, курсор следующей страницы)
+        """
+        columns = [
+            ShiftReport.id,
+            ShiftReport.location,
+            ShiftReport.shift_type,
+            ShiftReport.date,
+            ShiftReport.cashier_name,
+            ShiftReport.total_revenue,
+            ShiftReport.returns,
+            ShiftReport.total_acquiring,
+            ShiftReport.total_income,
+            ShiftReport.total_expenses,
+            ShiftReport.calculated_amount,
+            ShiftReport.fact_cash,
+            ShiftReport.surplus_shortage,
+            ShiftReport.status,
+            ShiftReport.created_at,
+        ]
+        if include_entries:
+            columns += [ShiftReport.income_entries, ShiftReport.expense_entries]
+        if include_comments:
+            columns.append(ShiftReport.comments)
+
+        query = select(*columns)
+        filters = []
+        if location:
+            filters.append(ShiftReport.location == location)
+        if cashier_name:
+            filters.append(ShiftReport.cashier_name == cashier_name)
+        if date_from:
+            filters.append(ShiftReport.date >= date_from)
+        if date_to:
+            filters.append(ShiftReport.date < date_to)
+        if status:
+            filters.append(ShiftReport.status == status)
+        if filters:
+            query = query.where(*filters)
+
+        total = await count_rows(db, query, ShiftReport.__tablename__, filtered=bool(filters), mode=count_mode)
+
+        result = await db.execute(apply_keyset(query, ShiftReport.date, ShiftReport.id, cursor, limit))
+        reports, next_cursor = split_page(result.all(), limit)
+        return reports, total, next_cursor
+
     async def update_status(
             self,
             db: AsyncSession,
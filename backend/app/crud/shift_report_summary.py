@@ -0,0 +1,183 @@
+# backend/app/crud/shift_report_summary.py
+from datetime import date
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, func, extract, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ShiftReport, ShiftReportDailySummary
+
+# Суммируемые поля отчета о смене
+SUMMARY_FIELDS = (
+    "total_revenue",
+    "returns",
+    "acquiring",
+    "qr_code",
+    "online_app",
+    "yandex_food",
+    "yandex_food_no_system",
+    "primehill",
+    "total_acquiring",
+    "total_income",
+    "total_expenses",
+    "fact_cash",
+    "surplus_shortage",
+)
+
+
+class ShiftReportSummaryCRUD:
+    """Дневные итоги отчетов о смене и выборки для дашбордов"""
+
+    @staticmethod
+    def _insert(db: AsyncSession):
+        """INSERT с поддержкой ON CONFLICT для PostgreSQL и SQLite, для остальных СУБД - None"""
+        dialect = db.bind.dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(ShiftReportDailySummary)
+        if dialect == "sqlite":
+            return sqlite.insert(ShiftReportDailySummary)
+        return None
+
+    async def add_report(self, db: AsyncSession, report: ShiftReport) -> None:
+        """
+        Добавляет отчет к итогам его дня (INSERT ... ON CONFLICT DO UPDATE).
+        Вызывается до commit, чтобы отчет и итоги сохранялись атомарно.
+        """
+        values = {field: getattr(report, field) or 0 for field in SUMMARY_FIELDS}
+        key = {"location": report.location, "cashier_name": report.cashier_name, "day": report.date.date()}
+
+        statement = self._insert(db)
+        if statement is None:
+            await self._add_report_fallback(db, key, values)
+            return
+
+        statement = statement.values(reports_count=1, **key, **values)
+        table = ShiftReportDailySummary.__table__
+        statement = statement.on_conflict_do_update(
+            index_elements=["location", "day", "cashier_name"],
+            set_={
+                "reports_count": table.c.reports_count + 1,
+                "updated_at": func.now(),
+                **{field: table.c[field] + statement.excluded[field] for field in SUMMARY_FIELDS},
+            }
+        )
+        await db.execute(statement)
+
+    @staticmethod
+    async def _add_report_fallback(db: AsyncSession, key: dict, values: dict) -> None:
+        """
+        То же без ON CONFLICT: UPDATE строки дня, а если ее нет - INSERT в точке сохранения.
+        Если строку одновременно вставил другой запрос, уникальный индекс отклонит INSERT
+        и отчет добавляется повторным UPDATE, не прерывая транзакцию создания отчета.
+        """
+        table = ShiftReportDailySummary.__table__
+        increment = (
+            update(ShiftReportDailySummary)
+            .where(*(table.c[name] == value for name, value in key.items()))
+            .values(
+                reports_count=table.c.reports_count + 1,
+                updated_at=func.now(),
+                **{field: table.c[field] + value for field, value in values.items()}
+            )
+        )
+        if (await db.execute(increment)).rowcount:
+            return
+
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(ShiftReportDailySummary).values(reports_count=1, **key, **values))
+        except IntegrityError:
+            await db.execute(increment)
+
+    async def get_daily(
+            self,
+            db: AsyncSession,
+            location: Optional[str] = None,
+            cashier_name: Optional[str] = None,
+            date_from: Optional[date] = None,
+            date_to: Optional[date] = None
+    ) -> List[Any]:
+        """
+        Итоги по дням с накопленным излишком/недостачей кассира на точке
+        (нарастающим итогом с начала истории, а не только выбранного периода).
+        """
+        try:
+            summary = ShiftReportDailySummary
+            cumulative = func.sum(summary.surplus_shortage).over(
+                partition_by=(summary.location, summary.cashier_name),
+                order_by=summary.day,
+            )
+            query = select(
+                summary.location,
+                summary.cashier_name,
+                summary.day,
+                summary.reports_count,
+                *(getattr(summary, field) for field in SUMMARY_FIELDS),
+                cumulative.label("cumulative_surplus_shortage"),
+            )
+            if location:
+                query = query.where(summary.location == location)
+            if cashier_name:
+                query = query.where(summary.cashier_name == cashier_name)
+            if date_to:
+                query = query.where(summary.day <= date_to)
+
+            rows = query.subquery()
+            query = select(rows)
+            # Нижняя граница снаружи окна, чтобы накопленный итог учитывал прошлые дни
+            if date_from:
+                query = query.where(rows.c.day >= date_from)
+
+            result = await db.execute(query.order_by(rows.c.day, rows.c.location, rows.c.cashier_name))
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Ошибка получения итогов смен: {str(e)}"
+            )
+
+    async def get_monthly(
+            self,
+            db: AsyncSession,
+            location: Optional[str] = None,
+            date_from: Optional[date] = None,
+            date_to: Optional[date] = None,
+            by_cashier: bool = False
+    ) -> List[Any]:
+        """Итоги по месяцам и точкам (и кассирам, если by_cashier)"""
+        try:
+            summary = ShiftReportDailySummary
+            year = extract("year", summary.day).label("year")
+            month = extract("month", summary.day).label("month")
+
+            group_by = [summary.location, year, month]
+            if by_cashier:
+                group_by.append(summary.cashier_name)
+
+            query = select(
+                *group_by,
+                func.sum(summary.reports_count).label("reports_count"),
+                *(func.sum(getattr(summary, field)).label(field) for field in SUMMARY_FIELDS),
+            )
+            if location:
+                query = query.where(summary.location == location)
+            if date_from:
+                query = query.where(summary.day >= date_from)
+            if date_to:
+                query = query.where(summary.day <= date_to)
+
+            result = await db.execute(query.group_by(*group_by).order_by(year, month, *group_by[:1], *group_by[3:]))
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Ошибка получения итогов смен: {str(e)}"
+            )
+
+
+shift_report_summary_crud = ShiftReportSummaryCRUD()
@@ -1,17 +1,17 @@
 from datetime import datetime
+from typing import Optional, Dict, Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from app.schemas import WriteoffTransferCreate
 from app.models import WriteoffTransfer
-from app.services import TelegramService
-import asyncio
+from app.services import TelegramService, get_telegram_service, outbox_dispatcher
 
 
 class WriteoffTransferCRUD:
-    def __init__(self):
+    def __init__(self, telegram_service: Optional[TelegramService] = None):
         try:
-            self.telegram_service = TelegramService()
+            self.telegram_service = telegram_service or get_telegram_service()
         except Exception as e:
             print(f"⚠️  Ошибка инициализации Telegram сервиса: {str(e)}")
             self.telegram_service = None
@@ -24,7 +24,7 @@ class WriteoffTransferCRUD:
     ) -> WriteoffTransfer:
         """
         Создает акт списания/перемещения.
-        Telegram отправка происходит асинхронно.
+        Telegram отправка идет через очередь доставки.
         """
         try:
             # Подготавливаем данные для JSON полей
@@ -64,15 +64,20 @@ class WriteoffTransferCRUD:
                 date=report_datetime
             )
 
+            # Сохраняем акт и задачу доставки в Telegram в одной транзакции
             db.add(db_report)
+            await db.flush()
+            outbox_dispatcher.enqueue(
+                db, "writeoff_transfer", db_report.id,
+                payload={"writeoff_or_transfer": writeoff_or_transfer}
+            )
             await db.commit()
             await db.refresh(db_report)
 
             print(f"✅ Акт списания/перемещения создан в БД с ID: {db_report.id}")
 
-            # Запускаем отправку в Telegram в фоне
-            if self.telegram_service:
-                asyncio.create_task(self._send_to_telegram_background(db_report.id, writeoff_or_transfer))
+            # Будим диспетчер очереди доставки
+            outbox_dispatcher.notify()
 
             return db_report
 
@@ -85,54 +90,40 @@ class WriteoffTransferCRUD:
             await db.rollback()
             raise e
 
-    async def _send_to_telegram_background(self, report_id: int, writeoff_or_transfer: str):
+    async def deliver_to_telegram(self, report_id: int, payload: Dict[str, Any]) -> bool:
         """
-        Фоновая отправка акта в Telegram.
+        Отправляет акт в Telegram из очереди доставки.
         """
         from ..core import db_helper
         from sqlalchemy import select
 
-        try:
-            # Создаем новую сессию БД для фоновой задачи
-            async with db_helper.session_factory() as db_session:
-                try:
-                    # Получаем отчет из БД
-                    result = await db_session.execute(
-                        select(WriteoffTransfer).where(WriteoffTransfer.id == report_id)
-                    )
-                    db_report = result.scalar_one_or_none()
-
-                    if not db_report:
-                        print(f"⚠️  Акт с ID {report_id} не найден для отправки в Telegram")
-                        return
-
-                    # Подготавливаем данные для отправки
-                    report_dict = {
-                        'location': db_report.location,
-                        'created_date': db_report.created_date,
-                        'cashier_name': db_report.cashier_name,
-                        'shift_type': db_report.shift_type,
-                        'writeoffs': db_report.writeoffs,
-                        'transfers': db_report.transfers,
-                        "writeoff_or_transfer": writeoff_or_transfer,
-                        "date": db_report.date
-                    }
-
-                    # Отправляем в Telegram (с таймаутом)
-                    telegram_success = await asyncio.wait_for(
-                        self.telegram_service.send_writeoff_transfer_report(report_dict),
-                        timeout=30  # 30 секунд таймаут
-                    )
-
-                    if telegram_success:
-                        print(f"✅ Акт списания/перемещения ID {report_id} отправлен в Telegram для локации: {db_report.location}")
-                    else:
-                        print(f"⚠️  Акт списания/перемещения ID {report_id} создан, но не отправлен в Telegram для локации: {db_report.location}")
-
-                except asyncio.TimeoutError:
-                    print(f"⏰ Таймаут при отправке акта ID {report_id} в Telegram")
-                except Exception as telegram_error:
-                    print(f"⚠️  Ошибка отправки акта ID {report_id} в Telegram: {str(telegram_error)}")
+        if not self.telegram_service:
+            return False
 
-        except Exception as e:
-            print(f"⚠️  Критическая ошибка в фоновой отправке Telegram для акта ID {report_id}: {str(e)}")
\ No newline at end of file
+        # Создаем новую сессию БД для фоновой задачи
+        async with db_helper.session_factory() as db_session:
+            # Получаем отчет из БД
+            result = await db_session.execute(
+                select(WriteoffTransfer).where(WriteoffTransfer.id == report_id)
+            )
+            db_report = result.scalar_one_or_none()
+
+            if not db_report:
+                print(f"⚠️  Акт с ID {report_id} не найден для отправки в Telegram")
+                return True
+
+            # Подготавливаем данные для отправки
+            report_dict = {
+                'location': db_report.location,
+                'created_date': db_report.created_date,
+                'cashier_name': db_report.cashier_name,
+                'shift_type': db_report.shift_type,
+                'writeoffs': db_report.writeoffs,
+                'transfers': db_report.transfers,
+                "writeoff_or_transfer": payload.get("writeoff_or_transfer"),
+                "date": db_report.date
+            }
+
+        return await self.telegram_service.send_writeoff_transfer_report(
+            report_dict, idempotency_key=payload.get("idempotency_key")
+        )
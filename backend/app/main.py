@@ -1,16 +1,149 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from app.api import api_router
 from fastapi.middleware.cors import CORSMiddleware
-from app.services import TelegramService
+from app.services import get_telegram_service, outbox_dispatcher, send_scheduler, image_service, inventory_catalog, update_queue, update_poller, task_supervisor
 from app.core.config import settings
+from app.core.database import db_helper
+from app.core.http_client import http_helper
+from app.core.metrics import MetricsMiddleware
 import asyncio
+import inspect
+from typing import Any, Callable, List, Tuple
+
+
+async def warm_up() -> None:
+    """
+    Параллельно прогревает пул соединений БД, кэш каталога товаров и HTTP сессию,
+    чтобы первые запросы не ждали подключений. Ошибки не мешают запуску.
+    """
+    async def warm_db():
+        await db_helper.warmup(min(settings.DB_WARMUP_CONNECTIONS, settings.DB_POOL_SIZE))
+
+    async def warm_catalog():
+        # Загружаем каталог товаров заранее, чтобы первая инвентаризация не ждала БД
+        await inventory_catalog.load()
+
+    async def warm_http():
+        await http_helper.get_session()
+
+    steps = {"пул БД": warm_db(), "каталог товаров": warm_catalog(), "HTTP сессия": warm_http()}
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*steps.values(), return_exceptions=True),
+            timeout=settings.STARTUP_WARMUP_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        print(f"⚠️  Прогрев не завершился за {settings.STARTUP_WARMUP_TIMEOUT:.0f} сек, продолжаем запуск")
+        return
+
+    for name, result in zip(steps, results):
+        if isinstance(result, Exception):
+            print(f"⚠️  Прогрев ({name}) не выполнен, подключимся при первом обращении: {str(result)}")
+
+
+async def register_webhook() -> None:
+    """Устанавливает веб-хук в фоне, не задерживая запуск сетевым запросом к Telegram"""
+    print(f"🔗 Установка веб-хука: {settings.WEBHOOK_URL}")
+    success = await get_telegram_service().set_webhook(settings.WEBHOOK_URL)
+    if success:
+        print("✅ Веб-хук установлен успешно")
+    else:
+        print("❌ Ошибка установки веб-хука")
+
+
+async def startup(app: FastAPI) -> None:
+    """Запуск приложения"""
+    print("🚀 Запуск ReportBot API...")
+
+    # Общий Telegram сервис процесса (тот же экземпляр используют CRUD классы и роуты)
+    app.state.telegram_service = get_telegram_service()
+
+    # Пул процессов обработки фото (создается до первой загрузки)
+    image_service.start()
+
+    await warm_up()
+
+    updates_mode = settings.TELEGRAM_UPDATES_MODE
+    if updates_mode == "webhook":
+        if settings.WEBHOOK_URL:
+            task_supervisor.spawn(register_webhook(), kind="telegram_set_webhook")
+        else:
+            print("⚠️  WEBHOOK_URL не задан, веб-хук не установлен (TELEGRAM_UPDATES_MODE=polling включит опрос)")
+    elif updates_mode == "none":
+        print("ℹ️  Обновления Telegram получает отдельный воркер (python -m app.worker)")
+
+    # Запускаем обработчики входящих обновлений (веб-хук и опрос getUpdates)
+    await update_queue.start()
+    if updates_mode == "polling":
+        await update_poller.start()
+
+    # Запускаем диспетчер очереди доставки отчетов в Telegram
+    await outbox_dispatcher.start()
+
+    print("✅ ReportBot API запущен успешно!")
+
+
+async def run_shutdown_steps(steps: List[Tuple[str, Callable[[], Any]]]) -> None:
+    """Выполняет шаги остановки по порядку; ошибка шага логируется и не прерывает остальные"""
+    for name, step in steps:
+        try:
+            result = step()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"⚠️  Ошибка при остановке ({name}): {str(e)}")
+
+
+async def shutdown(app: FastAPI) -> None:
+    """
+    Остановка приложения: начатые обработки обновлений и доставки в Telegram
+    получают SHUTDOWN_DRAIN_TIMEOUT секунд на завершение, затем закрываются
+    соединения с Telegram и базой.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.SHUTDOWN_DRAIN_TIMEOUT
+
+    def remaining() -> float:
+        return max(0.0, deadline - loop.time())
+
+    # Каждый шаг выполняется, даже если предыдущий завершился ошибкой:
+    # иначе остались бы открытыми HTTP сессия, процессы обработки фото и пул БД
+    steps = [
+        # Прекращаем опрос и дорабатываем принятые обновления
+        ("опрос getUpdates", update_poller.stop),
+        ("очередь обновлений", lambda: update_queue.stop(timeout=remaining())),
+        # Даем начатым доставкам завершиться (недоставленные отчеты останутся в БД)
+        ("диспетчер очереди Telegram", lambda: outbox_dispatcher.stop(timeout=remaining())),
+        # Остальные фоновые задачи (например, установка веб-хука)
+        ("фоновые задачи", lambda: task_supervisor.drain(timeout=remaining())),
+        ("планировщик отправки", send_scheduler.close),
+        # Общий пул HTTP соединений к Telegram
+        ("HTTP сессия", http_helper.close),
+        ("пул процессов обработки фото", image_service.shutdown),
+        ("соединения с БД", db_helper.dispose),
+    ]
+    await run_shutdown_steps(steps)
+
+    print("👋 ReportBot API остановлен")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup(app)
+    try:
+        yield
+    finally:
+        await shutdown(app)
+
 
 app = FastAPI(
     title="ReportBot API",
     description="API для создания отчетов кафе с интеграцией Telegram",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -21,6 +154,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Задержки и SQL статистика по маршрутам для /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Подключаем API роуты
 app.include_router(api_router)
 
@@ -28,29 +164,5 @@ app.include_router(api_router)
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Событие запуска приложения"""
-    print("🚀 Запуск ReportBot API...")
-
-    # Инициализируем Telegram сервис
-    telegram_service = TelegramService()
-
-    # Устанавливаем веб-хук если задан URL
-    if settings.WEBHOOK_URL:
-        print(f"🔗 Установка веб-хука: {settings.WEBHOOK_URL}")
-        success = await telegram_service.set_webhook(settings.WEBHOOK_URL)
-        if success:
-            print("✅ Веб-хук установлен успешно")
-        else:
-            print("❌ Ошибка установки веб-хука")
-    else:
-        print("⚠️  WEBHOOK_URL не задан, веб-хук не установлен")
-
-    print("✅ ReportBot API запущен успешно!")
-
-
-
-
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000, env_file='.dev.env')
\ No newline at end of file
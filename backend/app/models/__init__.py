@@ -1,18 +1,26 @@
 # backend/app/models/__init__.py
 from .base import Base
 from .shift_report import ShiftReport
+from .shift_report_summary import ShiftReportDailySummary
 from .daily_inventory import DailyInventory
 from .report_on_goods import ReportOnGoods
 from .writeoff_transfer import WriteoffTransfer
 from .inventory_item import InventoryItem
 from .daily_inventory_v2 import DailyInventoryV2
+from .daily_inventory_v2_line import DailyInventoryV2Line
+from .telegram_outbox import TelegramOutbox
+from .telegram_processed_update import TelegramProcessedUpdate
 
 __all__ = [
     "Base",
     "ShiftReport",
+    "ShiftReportDailySummary",
     "DailyInventory",
     "ReportOnGoods",
     "WriteoffTransfer",
     "InventoryItem",
-    "DailyInventoryV2"
+    "DailyInventoryV2",
+    "DailyInventoryV2Line",
+    "TelegramOutbox",
+    "TelegramProcessedUpdate"
 ]
\ No newline at end of file
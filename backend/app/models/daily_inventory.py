@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, func, Integer, SmallInteger
+from sqlalchemy import Column, String, DateTime, func, Integer, SmallInteger, Index
 
 from .base import Base
 
@@ -30,3 +30,9 @@ class DailyInventory(Base):
     sirny_sous_dip = Column(SmallInteger, nullable=False)
     kuriza_jareny = Column(SmallInteger, nullable=False)
     kuriza_siraya = Column(SmallInteger, nullable=False)
+
+    # Выгрузка /exports/daily_inventory: фильтр по точке и периоду
+    __table_args__ = (
+        Index("ix_dailyinventory_location_date", location, date.desc()),
+        Index("ix_dailyinventory_location_shift_type_date", location, shift_type, date),
+    )
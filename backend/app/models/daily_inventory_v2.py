@@ -1,6 +1,7 @@
 # backend/app/models/daily_inventory_v2.py
-from sqlalchemy import Column, String, DateTime, func, Integer, JSON
+from sqlalchemy import Column, String, DateTime, func, Integer, Index
 from .base import Base
+from .types import JSONDocument, gin_index
 
 
 class DailyInventoryV2(Base):
@@ -14,7 +15,16 @@ class DailyInventoryV2(Base):
 
     # JSON поле для хранения данных инвентаризации
     # Структура: [{"item_id": 1, "quantity": 10}, {"item_id": 2, "quantity": 5}]
-    inventory_data = Column(JSON, nullable=False, default=list)
+    inventory_data = Column(JSONDocument, nullable=False, default=list)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    # get_inventory_list: фильтр по точке и смене, курсор (date, id);
+    # get_item_history и расход (/consumption): точка и период по дате
+    __table_args__ = (
+        Index("ix_dailyinventoryv2_location_date", location, date.desc()),
+        Index("ix_dailyinventoryv2_location_shift_type_date", location, shift_type, date),
+        # get_inventory_list с item_id: json_contains(inventory_data, {"item_id": ...}), оператор @>
+        gin_index("ix_dailyinventoryv2_inventory_data_gin", "inventory_data"),
+    )
@@ -0,0 +1,24 @@
+# backend/app/models/daily_inventory_v2_line.py
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from .base import Base
+
+
+class DailyInventoryV2Line(Base):
+    """
+    Строка инвентаризации v2: один товар одного отчета.
+    Дублирует inventory_data в нормализованном виде для агрегаций по товарам в SQL.
+    """
+    __tablename__ = "daily_inventory_v2_line"
+
+    id = Column(Integer, primary_key=True)
+
+    inventory_id = Column(
+        Integer, ForeignKey("dailyinventoryv2.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    item_id = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+
+    # История товара: все строки товара с переходом к отчету
+    __table_args__ = (
+        Index("ix_daily_inventory_v2_line_item_id_inventory_id", item_id, inventory_id),
+    )
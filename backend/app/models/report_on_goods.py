@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, JSON
+from sqlalchemy import Column, Integer, String, DateTime, func, JSON, Index
 
 from .base import Base
+from .types import JSONDocument, gin_index
 
 class ReportOnGoods(Base):
     id = Column(Integer, primary_key=True, index=True)
@@ -11,10 +12,22 @@ class ReportOnGoods(Base):
     cashier_name = Column(String(255), nullable=False)
 
     # КУХНЯ
-    kuxnya = Column(JSON, nullable=False, default=list)
+    kuxnya = Column(JSONDocument, nullable=False, default=list)
 
     #БАР
-    bar = Column(JSON, nullable=False, default=list)
+    bar = Column(JSONDocument, nullable=False, default=list)
 
     # Упаковки/хоз
-    upakovki_xoz = Column(JSON, nullable=False, default=list)
+    upakovki_xoz = Column(JSONDocument, nullable=False, default=list)
+
+    # Пути к сохраненным фотографиям товаров/накладных
+    photo_paths = Column(JSON, nullable=False, default=list)
+
+    # Выгрузка /exports/report_on_goods: фильтр по точке и периоду
+    __table_args__ = (
+        Index("ix_reportongoods_location_date", location, date.desc()),
+        Index("ix_reportongoods_location_shift_type_date", location, shift_type, date),
+        gin_index("ix_reportongoods_kuxnya_gin", "kuxnya"),
+        gin_index("ix_reportongoods_bar_gin", "bar"),
+        gin_index("ix_reportongoods_upakovki_xoz_gin", "upakovki_xoz"),
+    )
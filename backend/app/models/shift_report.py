@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Numeric, Text, func
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, Text, func, Index
 from .base import Base
+from .types import JSONDocument, gin_index
 
 
 class ShiftReport(Base):
@@ -12,11 +13,11 @@ class ShiftReport(Base):
     cashier_name = Column(String(255), nullable=False)
 
     # Приходы денег/внесения (максимум 5 полей)
-    income_entries = Column(JSON, nullable=True, default=list)
+    income_entries = Column(JSONDocument, nullable=True, default=list)
     total_income = Column(Numeric(10, 2), nullable=False, default=0)
 
     # Расходы (максимум 10 полей)
-    expense_entries = Column(JSON, nullable=True, default=list)
+    expense_entries = Column(JSONDocument, nullable=True, default=list)
     total_expenses = Column(Numeric(10, 2), nullable=False, default=0)
 
     # Информация из iiko
@@ -43,4 +44,14 @@ class ShiftReport(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     status = Column(String(20), nullable=False, default="draft")  # "draft", "sent"
 
-    comments = Column(Text, nullable=True)
\ No newline at end of file
+    comments = Column(Text, nullable=True)
+
+    # get_shift_reports: фильтр по точке и периоду, страницы по курсору (date, id) от новых к старым
+    __table_args__ = (
+        Index("ix_shift_reports_location_date", location, date.desc()),
+        Index("ix_shift_reports_location_shift_type_date", location, shift_type, date),
+        # get_shift_reports(status="draft"): частичный индекс, отправленные отчеты в него не попадают
+        Index("ix_shift_reports_draft_date", date, postgresql_where=status == "draft", sqlite_where=status == "draft"),
+        gin_index("ix_shift_reports_income_entries_gin", "income_entries"),
+        gin_index("ix_shift_reports_expense_entries_gin", "expense_entries"),
+    )
@@ -0,0 +1,42 @@
+# backend/app/models/shift_report_summary.py
+from sqlalchemy import Column, Integer, String, Date, Numeric, DateTime, UniqueConstraint, func
+from .base import Base
+
+
+class ShiftReportDailySummary(Base):
+    """
+    Дневные итоги отчетов о смене по точке и кассиру.
+    Обновляется в той же транзакции, что и создание отчета (см. ShiftReportSummaryCRUD).
+    """
+    __tablename__ = "shift_report_daily_summary"
+
+    id = Column(Integer, primary_key=True)
+
+    location = Column(String(255), nullable=False)
+    cashier_name = Column(String(255), nullable=False)
+    day = Column(Date, nullable=False)  # Дата отчета по московскому времени
+
+    reports_count = Column(Integer, nullable=False, default=0)
+
+    total_revenue = Column(Numeric(14, 2), nullable=False, default=0)
+    returns = Column(Numeric(14, 2), nullable=False, default=0)
+
+    # Безналичные поступления
+    acquiring = Column(Numeric(14, 2), nullable=False, default=0)
+    qr_code = Column(Numeric(14, 2), nullable=False, default=0)
+    online_app = Column(Numeric(14, 2), nullable=False, default=0)
+    yandex_food = Column(Numeric(14, 2), nullable=False, default=0)
+    yandex_food_no_system = Column(Numeric(14, 2), nullable=False, default=0)
+    primehill = Column(Numeric(14, 2), nullable=False, default=0)
+    total_acquiring = Column(Numeric(14, 2), nullable=False, default=0)
+
+    total_income = Column(Numeric(14, 2), nullable=False, default=0)
+    total_expenses = Column(Numeric(14, 2), nullable=False, default=0)
+    fact_cash = Column(Numeric(14, 2), nullable=False, default=0)
+    surplus_shortage = Column(Numeric(14, 2), nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("location", "day", "cashier_name", name="uq_shift_report_daily_summary_location_day_cashier"),
+    )
@@ -0,0 +1,27 @@
+# backend/app/models/telegram_outbox.py
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Text, Index, func
+from .base import Base
+
+
+class TelegramOutbox(Base):
+    """Очередь доставки отчетов в Telegram (пишется в одной транзакции с отчетом)"""
+    __tablename__ = "telegram_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    report_type = Column(String(50), nullable=False)  # "shift_report", "daily_inventory", ...
+    report_id = Column(Integer, nullable=False)
+    # Дополнительные параметры доставки, которых нет в самом отчете
+    payload = Column(JSON, nullable=False, default=dict)
+
+    status = Column(String(20), nullable=False, default="pending")  # "pending", "sent", "failed"
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_telegram_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
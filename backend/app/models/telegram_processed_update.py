@@ -0,0 +1,16 @@
+# backend/app/models/telegram_processed_update.py
+from sqlalchemy import Column, BigInteger, DateTime, Index, func
+from .base import Base
+
+
+class TelegramProcessedUpdate(Base):
+    """Уже обработанные обновления Telegram (защита от повторной доставки между воркерами и рестартами)"""
+    __tablename__ = "telegram_processed_update"
+
+    update_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    processed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Очистка записей старше окна дедупликации
+        Index("ix_telegram_processed_update_processed_at", "processed_at"),
+    )
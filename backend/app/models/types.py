@@ -0,0 +1,113 @@
+# backend/app/models/types.py
+from typing import Any
+
+from sqlalchemy import JSON, Integer, Index, String, literal, literal_column, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.sql.functions import GenericFunction
+from sqlalchemy.types import Boolean
+
+# Данные отчетов: JSONB в PostgreSQL (бинарное хранение, GIN индексы, оператор @>),
+# обычный JSON в остальных СУБД (SQLite в бенчмарках)
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+def gin_index(name: str, column_name: str) -> Index:
+    """
+    GIN индекс (jsonb_path_ops) по JSONB колонке для запросов json_contains.
+    Создается только в PostgreSQL.
+    """
+    return Index(
+        name,
+        column_name,
+        postgresql_using="gin",
+        postgresql_ops={column_name: "jsonb_path_ops"},
+    ).ddl_if(dialect="postgresql")
+
+
+class json_array_length(GenericFunction):
+    """Длина JSON массива: jsonb_array_length в PostgreSQL, json_array_length в остальных СУБД"""
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(json_array_length, "postgresql")
+def _compile_json_array_length_postgresql(element, compiler, **kw):
+    return f"jsonb_array_length({compiler.process(element.clauses, **kw)})"
+
+
+class json_contains(ColumnElement):
+    """
+    Условие "JSON массив column содержит элемент, у которого есть все пары value".
+    В PostgreSQL это column @> '[value]' и оно использует GIN индекс.
+    """
+    type = Boolean()
+    inherit_cache = False
+
+    def __init__(self, column, value: dict):
+        self.column = column
+        self.value = value
+
+
+@compiles(json_contains, "postgresql")
+def _compile_json_contains_postgresql(element, compiler, **kw):
+    return compiler.process(type_coerce(element.column, JSONB()).contains([element.value]), **kw)
+
+
+@compiles(json_contains)
+def _compile_json_contains_default(element, compiler, **kw):
+    # SQLite: перебор элементов массива через json_each
+    column = compiler.process(element.column, **kw)
+    conditions = " AND ".join(
+        f"json_extract(value, '$.{key}') = {compiler.process(literal(_plain(value)), **kw)}"
+        for key, value in element.value.items()
+    )
+    return f"EXISTS (SELECT 1 FROM json_each({column}) WHERE {conditions})"
+
+
+def _plain(value: Any) -> Any:
+    # json_extract возвращает 1/0 для true/false
+    return int(value) if isinstance(value, bool) else value
+
+
+class json_array_elements(GenericFunction):
+    """
+    Элементы JSON массива как таблица с колонкой value:
+    jsonb_array_elements в PostgreSQL, json_each в SQLite.
+    Используется как json_array_elements(column).table_valued("value").
+    """
+    inherit_cache = True
+
+
+@compiles(json_array_elements, "postgresql")
+def _compile_json_array_elements_postgresql(element, compiler, **kw):
+    return f"jsonb_array_elements({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(json_array_elements)
+def _compile_json_array_elements_default(element, compiler, **kw):
+    return f"json_each({compiler.process(element.clauses, **kw)})"
+
+
+class json_field(GenericFunction):
+    """Текстовое значение поля JSON объекта: value ->> 'key' в PostgreSQL, json_extract в SQLite"""
+    type = String()
+    inherit_cache = True
+
+    def __init__(self, value, key: str, **kwargs):
+        # Ключ - часть текста запроса (и ключа кэша), а не параметр: так PostgreSQL
+        # однозначно выбирает оператор ->> (text)
+        super().__init__(value, literal_column("'{}'".format(key.replace("'", "''"))), **kwargs)
+
+
+@compiles(json_field, "postgresql")
+def _compile_json_field_postgresql(element, compiler, **kw):
+    value, key = element.clauses.clauses
+    return f"({compiler.process(value, **kw)} ->> {compiler.process(key, **kw)})"
+
+
+@compiles(json_field)
+def _compile_json_field_default(element, compiler, **kw):
+    value, key = element.clauses.clauses
+    return f"json_extract({compiler.process(value, **kw)}, '$.' || {compiler.process(key, **kw)})"
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, JSON, Date
+from sqlalchemy import Column, Integer, String, DateTime, func, Date, Index
 
 from .base import Base
+from .types import JSONDocument, gin_index
 
 
 class WriteoffTransfer(Base):
@@ -14,7 +15,15 @@ class WriteoffTransfer(Base):
     date = Column(DateTime(timezone=True), nullable=True)
 
     # Списания - массив объектов {name, weight, reason}
-    writeoffs = Column(JSON, nullable=False, default=list)
+    writeoffs = Column(JSONDocument, nullable=False, default=list)
 
     # Перемещения - массив объектов {name, weight, reason}
-    transfers = Column(JSON, nullable=False, default=list)
\ No newline at end of file
+    transfers = Column(JSONDocument, nullable=False, default=list)
+
+    # Выгрузка /exports/writeoff_transfer: фильтр по точке
+    __table_args__ = (
+        Index("ix_writeofftransfer_location_date", location, date.desc()),
+        Index("ix_writeofftransfer_location_shift_type_date", location, shift_type, date),
+        gin_index("ix_writeofftransfer_writeoffs_gin", "writeoffs"),
+        gin_index("ix_writeofftransfer_transfers_gin", "transfers"),
+    )
@@ -1,5 +1,12 @@
 # backend/app/schemas/__init__.py
-from .shift_report import ShiftReportCreate, ShiftReportResponse, IncomeEntry, ExpenseEntry
+from .shift_report import (
+    ShiftReportCreate,
+    ShiftReportResponse,
+    ShiftReportListItem,
+    ShiftReportList,
+    IncomeEntry,
+    ExpenseEntry
+)
 from .daily_inventory import DailyInventoryCreate, DailyInventoryResponse
 from .report_on_goods import ReportOnGoodsCreate, ReportOnGoodsResponse, KuxnyaJson, BarJson, UpakovkyJson
 from .writeoff_transfer import WriteoffTransferCreate, WriteoffTransferResponse, WriteoffEntry, TransferEntry
@@ -19,6 +26,8 @@ from .daily_inventory_v2 import (
 __all__ = [
     'ShiftReportCreate',
     'ShiftReportResponse',
+    'ShiftReportListItem',
+    'ShiftReportList',
     'IncomeEntry',
     'ExpenseEntry',
     'DailyInventoryCreate',
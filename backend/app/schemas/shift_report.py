@@ -246,4 +246,39 @@ class ShiftReportResponse(BaseModel):
                 "status": "draft",
                 "created_at": "2025-05-28T10:30:00Z"
             }
-        }
\ No newline at end of file
+        }
+
+
+class ShiftReportListItem(BaseModel):
+    """Отчет смены в списке: без фото и, если не запрошены, без списков приходов/расходов и комментария"""
+
+    id: int
+    location: str
+    shift_type: str
+    date: datetime
+    cashier_name: str
+
+    total_revenue: float
+    returns: float
+    total_acquiring: float
+    total_income: float
+    total_expenses: float
+    calculated_amount: float
+    fact_cash: float
+    surplus_shortage: float
+
+    status: str
+    created_at: Optional[datetime] = None
+
+    # Только при include=entries / include=comments
+    income_entries: Optional[List[Dict[str, Any]]] = None
+    expense_entries: Optional[List[Dict[str, Any]]] = None
+    comments: Optional[str] = None
+
+
+class ShiftReportList(BaseModel):
+    """Страница списка отчетов смены"""
+    reports: List[ShiftReportListItem]
+    total: Optional[int] = Field(default=None, description="Всего отчетов (None при count=none)")
+    limit: int
+    next_cursor: Optional[str] = Field(default=None, description="Курсор следующей страницы")
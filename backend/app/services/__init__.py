@@ -1,5 +1,19 @@
 from .file_service import FileService
 from .report_calculator import ReportCalculator
-from .telegram_service import TelegramService
+from .image_service import ImageService, image_service
+from .telegram_service import TelegramService, get_telegram_service
+from .telegram_scheduler import TelegramSendScheduler, send_scheduler
+from .telegram_retry import RetryPolicy, retry_policy
+from .task_supervisor import TaskSupervisor, task_supervisor
+from .outbox import OutboxDispatcher, outbox_dispatcher
+from .inventory_catalog import InventoryCatalog, inventory_catalog
+from .export_service import ExportService, export_service
+from .update_dedup import UpdateDeduplicator, update_deduplicator
+from .update_queue import TelegramUpdateQueue, update_queue
+from .update_poller import TelegramUpdatePoller, update_poller
 
-__all__ = ['FileService', 'ReportCalculator', 'TelegramService']
\ No newline at end of file
+__all__ = ['FileService', 'ReportCalculator', 'ImageService', 'image_service', 'TelegramService', 'get_telegram_service', 'TelegramSendScheduler',
+           'send_scheduler', 'RetryPolicy', 'retry_policy', 'TaskSupervisor', 'task_supervisor', 'OutboxDispatcher', 'outbox_dispatcher',
+           'InventoryCatalog', 'inventory_catalog', 'ExportService', 'export_service',
+           'UpdateDeduplicator', 'update_deduplicator', 'TelegramUpdateQueue', 'update_queue',
+           'TelegramUpdatePoller', 'update_poller']
\ No newline at end of file
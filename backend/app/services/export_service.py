@@ -0,0 +1,359 @@
+# backend/app/services/export_service.py
+import csv
+import io
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+from xml.sax.saxutils import escape
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.constants import DAILY_INVENTORY_DRINKS, DAILY_INVENTORY_FOOD
+from app.core.database import db_helper
+from app.models import DailyInventory, DailyInventoryV2, ReportOnGoods, ShiftReport, WriteoffTransfer
+from app.services.inventory_catalog import inventory_catalog
+
+MOSCOW_TZ = ZoneInfo("Europe/Moscow")
+SHIFT_NAMES = {"morning": "Утренняя", "night": "Ночная"}
+# Начало значения, с которого Excel/LibreOffice считают ячейку CSV формулой
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+Row = List[Any]
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """Описание выгрузки: модель, колонка даты для фильтра, заголовки и строки одного отчета"""
+    model: Any
+    title: str
+    headers: List[str]
+    rows: Callable[[Any, Dict[int, Any]], Iterable[Row]]
+    date_column: Callable[[], Any]
+
+
+def _local(value: Optional[datetime]) -> Optional[datetime]:
+    """Дата отчета по московскому времени, без часового пояса (для таблиц)"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(MOSCOW_TZ)
+    return value.replace(tzinfo=None)
+
+
+def _moscow(value: Optional[datetime]) -> Optional[datetime]:
+    """Граница периода: дата без часового пояса считается московской, как и даты в выгрузке"""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=MOSCOW_TZ)
+
+
+def _csv_value(value: Any) -> Any:
+    """
+    Значение ячейки CSV. Текст, который начинается как формула (кассир, комментарии,
+    причины списания и т.п. вводят пользователи), экранируется апострофом, чтобы
+    табличный редактор не выполнил его при открытии файла.
+    """
+    if isinstance(value, datetime):
+        return value.strftime("%d.%m.%Y %H:%M")
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _base(report) -> Row:
+    return [report.id, _local(report.date), report.location, SHIFT_NAMES.get(report.shift_type, report.shift_type),
+            report.cashier_name]
+
+
+BASE_HEADERS = ["ID", "Дата", "Локация", "Смена", "Кассир"]
+
+
+def _shift_report_rows(report: ShiftReport, items: Dict[int, Any]) -> Iterable[Row]:
+    income = "; ".join(f"{entry.get('comment', '')}: {entry.get('amount')}" for entry in report.income_entries or [])
+    expenses = "; ".join(f"{entry.get('description', '')}: {entry.get('amount')}" for entry in report.expense_entries or [])
+    yield _base(report) + [
+        report.total_revenue, report.returns, report.acquiring, report.qr_code, report.online_app,
+        report.yandex_food, report.yandex_food_no_system, report.primehill, report.total_acquiring,
+        report.total_income, income, report.total_expenses, expenses,
+        report.calculated_amount, report.fact_cash, report.surplus_shortage, report.status, report.comments,
+    ]
+
+
+def _daily_inventory_rows(report: DailyInventory, items: Dict[int, Any]) -> Iterable[Row]:
+    yield _base(report) + [getattr(report, key) for _, key in DAILY_INVENTORY_DRINKS + DAILY_INVENTORY_FOOD]
+
+
+def _daily_inventory_v2_rows(report: DailyInventoryV2, items: Dict[int, Any]) -> Iterable[Row]:
+    # Строка на каждый товар инвентаризации
+    for entry in report.inventory_data or []:
+        item = items.get(entry.get("item_id"))
+        yield _base(report) + [
+            entry.get("item_id"),
+            item.name if item else "Товар не найден",
+            item.unit if item else "шт",
+            entry.get("quantity"),
+        ]
+
+
+def _report_on_goods_rows(report: ReportOnGoods, items: Dict[int, Any]) -> Iterable[Row]:
+    sections = (("Кухня", report.kuxnya), ("Бар", report.bar), ("Упаковки/хоз", report.upakovki_xoz))
+    for section, entries in sections:
+        for entry in entries or []:
+            yield _base(report) + [section, entry.get("name"), entry.get("count"), entry.get("unit")]
+
+
+def _writeoff_transfer_rows(report: WriteoffTransfer, items: Dict[int, Any]) -> Iterable[Row]:
+    date_value = report.date or report.created_date
+    base = [report.id, _local(date_value), report.location, SHIFT_NAMES.get(report.shift_type, report.shift_type),
+            report.cashier_name]
+    for operation, entries in (("Списание", report.writeoffs), ("Перемещение", report.transfers)):
+        for entry in entries or []:
+            yield base + [operation, entry.get("name"), entry.get("weight"), entry.get("unit"), entry.get("reason")]
+
+
+EXPORTS: Dict[str, ExportSpec] = {
+    "shift_reports": ExportSpec(
+        model=ShiftReport,
+        title="Отчеты смены",
+        headers=BASE_HEADERS + [
+            "Выручка", "Возвраты", "Эквайринг", "QR код", "Онлайн приложение", "Яндекс Еда",
+            "Яндекс Еда (вручную)", "Primehill", "Итого безнал", "Приходы", "Приходы (детали)",
+            "Расходы", "Расходы (детали)", "Расчетная сумма", "Факт наличные", "Излишек/недостача",
+            "Статус", "Комментарий",
+        ],
+        rows=_shift_report_rows,
+        date_column=lambda: ShiftReport.date,
+    ),
+    "daily_inventory": ExportSpec(
+        model=DailyInventory,
+        title="Инвентаризация",
+        headers=BASE_HEADERS + [name for name, _ in DAILY_INVENTORY_DRINKS + DAILY_INVENTORY_FOOD],
+        rows=_daily_inventory_rows,
+        date_column=lambda: DailyInventory.date,
+    ),
+    "daily_inventory_v2": ExportSpec(
+        model=DailyInventoryV2,
+        title="Инвентаризация v2",
+        headers=BASE_HEADERS + ["ID товара", "Товар", "Ед. изм.", "Количество"],
+        rows=_daily_inventory_v2_rows,
+        date_column=lambda: DailyInventoryV2.date,
+    ),
+    "report_on_goods": ExportSpec(
+        model=ReportOnGoods,
+        title="Приемка товаров",
+        headers=BASE_HEADERS + ["Раздел", "Наименование", "Количество", "Ед. изм."],
+        rows=_report_on_goods_rows,
+        date_column=lambda: ReportOnGoods.date,
+    ),
+    "writeoff_transfer": ExportSpec(
+        model=WriteoffTransfer,
+        title="Списания и перемещения",
+        headers=BASE_HEADERS + ["Операция", "Наименование", "Количество", "Ед. изм.", "Причина"],
+        rows=_writeoff_transfer_rows,
+        date_column=lambda: func.coalesce(WriteoffTransfer.date, WriteoffTransfer.created_date),
+    ),
+}
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Поток без перемотки для zipfile: накапливает байты, которые забирает генератор ответа"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _xlsx_cell(ref: str, value: Any) -> str:
+    if value is None or value == "":
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        value = value.strftime("%d.%m.%Y %H:%M")
+    elif isinstance(value, date):
+        value = value.strftime("%d.%m.%Y")
+    # Текст всегда пишется строковой ячейкой (inlineStr, без <f>): значение вида "=..."
+    # отображается как есть и не вычисляется как формула
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>'
+
+
+XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+class ExportService:
+    """
+    Потоковая выгрузка отчетов в CSV и XLSX.
+
+    Отчеты читаются пачками по id (keyset), каждая пачка - в своей короткой сессии:
+    память не растет с объемом выгрузки, а соединение из пула не занято, пока клиент
+    медленно скачивает файл.
+    """
+
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = batch_size
+
+    async def iter_rows(
+            self,
+            spec: ExportSpec,
+            location: Optional[str] = None,
+            date_from: Optional[datetime] = None,
+            date_to: Optional[datetime] = None
+    ) -> AsyncIterator[Row]:
+        """Строки выгрузки в порядке id отчетов"""
+        model = spec.model
+        filters = []
+        if location:
+            filters.append(model.location == location)
+        if date_from:
+            filters.append(spec.date_column() >= _moscow(date_from))
+        if date_to:
+            filters.append(spec.date_column() < _moscow(date_to))
+
+        items = await inventory_catalog.get_items() if model is DailyInventoryV2 else {}
+
+        last_id = 0
+        while True:
+            async with db_helper.session_factory() as session:
+                result = await session.execute(
+                    select(model).where(model.id > last_id, *filters).order_by(model.id).limit(self.batch_size)
+                )
+                reports = result.scalars().all()
+
+            for report in reports:
+                for row in spec.rows(report, items):
+                    yield row
+
+            if len(reports) < self.batch_size:
+                return
+            last_id = reports[-1].id
+
+    async def stream_csv(self, spec: ExportSpec, **filters) -> AsyncIterator[bytes]:
+        """
+        CSV для Excel: UTF-8 с BOM и разделитель ";" (русская локаль Excel
+        иначе не распознает кириллицу и колонки)
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=";")
+
+        buffer.write("\ufeff")
+        writer.writerow(spec.headers)
+
+        async for row in self.iter_rows(spec, **filters):
+            writer.writerow(_csv_value(value) for value in row)
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue().encode("utf-8")
+
+    async def stream_xlsx(self, spec: ExportSpec, **filters) -> AsyncIterator[bytes]:
+        """
+        XLSX из одного листа. Лист пишется в zip по мере чтения строк
+        (строки как inline строки, без sharedStrings), готовые байты сразу уходят клиенту.
+        """
+        output = _StreamBuffer()
+        with zipfile.ZipFile(output, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, content in XLSX_STATIC_PARTS.items():
+                archive.writestr(name, content)
+            archive.writestr(
+                "xl/workbook.xml",
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                f'<sheets><sheet name="{escape(spec.title[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+                '</workbook>'
+            )
+
+            with archive.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+                sheet.write(
+                    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                )
+
+                row_number = 0
+                pending: List[str] = []
+
+                async def rows():
+                    yield spec.headers
+                    async for row in self.iter_rows(spec, **filters):
+                        yield row
+
+                async for row in rows():
+                    row_number += 1
+                    cells = "".join(
+                        _xlsx_cell(f"{_column_letter(index)}{row_number}", value)
+                        for index, value in enumerate(row)
+                    )
+                    pending.append(f'<row r="{row_number}">{cells}</row>')
+
+                    if len(pending) >= 200:
+                        sheet.write("".join(pending).encode("utf-8"))
+                        pending.clear()
+                        chunk = output.drain()
+                        if chunk:
+                            yield chunk
+
+                sheet.write("".join(pending).encode("utf-8"))
+                sheet.write(b"</sheetData></worksheet>")
+
+        yield output.drain()
+
+
+# Создание экземпляра ExportService с настройками из конфигурации
+export_service = ExportService(batch_size=settings.EXPORT_BATCH_SIZE)
@@ -1,22 +1,37 @@
+import asyncio
 import base64
 import os
 import uuid
 from pathlib import Path
+from typing import List, Optional
 from fastapi import HTTPException, UploadFile
 
+from app.core.config import settings
+from app.services.image_service import DERIVATIVE_SUFFIX
+
 
 class FileService:
-    def __init__(self, upload_folder: str = "./uploads"):
+    # Размер порции при потоковом сохранении загрузки
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, upload_folder: str = "./uploads", max_photo_size: Optional[int] = None):
         self.upload_folder = Path(upload_folder)
+        self.max_photo_size = max_photo_size or settings.UPLOAD_MAX_PHOTO_SIZE
         self.upload_folder.mkdir(exist_ok=True)
 
         # Создаем папку для фото отчетов смен
         self.shift_reports_folder = self.upload_folder / "shift_reports"
         self.shift_reports_folder.mkdir(exist_ok=True)
 
-    def save_shift_report_photo(self, photo: UploadFile) -> str:
+        # Создаем папку для фото отчетов приема товаров
+        self.goods_reports_folder = self.upload_folder / "goods_reports"
+        self.goods_reports_folder.mkdir(exist_ok=True)
+
+    async def save_shift_report_photo(self, photo: UploadFile) -> str:
         """
         Сохраняет фото отчета смены и возвращает путь к файлу.
+        Файл пишется порциями в отдельном потоке, поэтому память не зависит от размера фото,
+        а загрузка больше max_photo_size прерывается с ошибкой 413.
         """
         try:
             # Проверяем, что файл загружен
@@ -33,17 +48,19 @@ class FileService:
                     detail=f"Недопустимый тип файла. Разрешены: {', '.join(allowed_extensions)}"
                 )
 
+            # Размер известен заранее - отклоняем слишком большой файл, не читая его
+            if photo.size is not None and photo.size > self.max_photo_size:
+                raise self._too_large_error()
+
             # Генерируем уникальное имя файла
             file_name = f"{uuid.uuid4()}{file_ext}"
-            file_path = self.shift_reports_folder / file_name  # Исправлено!
+            file_path = self.shift_reports_folder / file_name
 
-            # Сохраняем файл
-            with open(file_path, "wb") as buffer:
-                content = photo.file.read()
-                buffer.write(content)
+            # Сохраняем файл (облегченная копия для Telegram создается при доставке)
+            await self.save_upload_stream(photo, file_path)
 
             # Сбрасываем указатель файла на начало для возможного повторного использования
-            photo.file.seek(0)
+            await photo.seek(0)
 
             # Возвращаем относительный путь
             return str(file_path)
@@ -53,6 +70,81 @@ class FileService:
                 raise e
             raise HTTPException(status_code=500, detail=f"Ошибка сохранения файла: {str(e)}")
 
+    async def save_goods_report_photos(self, photos: List[UploadFile]) -> List[str]:
+        """
+        Сохраняет фото отчета приема товаров и возвращает пути к файлам.
+        Если одно из фото не удалось сохранить, уже сохраненные удаляются.
+        """
+        saved_paths: List[str] = []
+
+        try:
+            for photo in photos:
+                if not photo or not photo.filename:
+                    continue
+
+                if photo.content_type and not photo.content_type.startswith('image/'):
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Файл {photo.filename} не является изображением"
+                    )
+
+                if photo.size is not None and photo.size > self.max_photo_size:
+                    raise self._too_large_error()
+
+                file_ext = Path(photo.filename).suffix.lower() or ".jpg"
+                file_path = self.goods_reports_folder / f"{uuid.uuid4()}{file_ext}"
+
+                await self.save_upload_stream(photo, file_path)
+                saved_paths.append(str(file_path))
+
+            return saved_paths
+
+        except Exception as e:
+            for saved_path in saved_paths:
+                await asyncio.to_thread(self._remove_quietly, Path(saved_path))
+            if isinstance(e, HTTPException):
+                raise e
+            raise HTTPException(status_code=500, detail=f"Ошибка сохранения файла: {str(e)}")
+
+    async def save_upload_stream(self, upload: UploadFile, file_path: Path) -> int:
+        """
+        Потоково копирует загруженный файл на диск, не блокируя цикл событий.
+        При превышении лимита размера недописанный файл удаляется.
+
+        :return: Количество записанных байт
+        """
+        written = 0
+        buffer = await asyncio.to_thread(open, file_path, "wb")
+        try:
+            while True:
+                chunk = await upload.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                written += len(chunk)
+                if written > self.max_photo_size:
+                    raise self._too_large_error()
+
+                await asyncio.to_thread(buffer.write, chunk)
+        except BaseException:
+            await asyncio.to_thread(buffer.close)
+            await asyncio.to_thread(self._remove_quietly, file_path)
+            raise
+
+        await asyncio.to_thread(buffer.close)
+        return written
+
+    def _too_large_error(self) -> HTTPException:
+        limit_mb = self.max_photo_size / (1024 * 1024)
+        return HTTPException(status_code=413, detail=f"Файл слишком большой. Максимум {limit_mb:.0f} МБ")
+
+    @staticmethod
+    def _remove_quietly(file_path: Path) -> None:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
     def get_shift_report_photo_url(self, file_path: str) -> str:
         """
         Возвращает URL для доступа к фото отчета.
@@ -68,10 +160,26 @@ class FileService:
         """
         Удаляет фото отчета.
         """
+        return self._delete_photo(file_path)
+
+    async def delete_goods_report_photos(self, file_paths: List[str]) -> None:
+        """
+        Удаляет фото отчета приема товаров вместе с облегченными копиями.
+        Файлы удаляются в отдельном потоке, не блокируя цикл событий.
+        """
+        def delete_all():
+            for file_path in file_paths:
+                self._delete_photo(file_path)
+
+        await asyncio.to_thread(delete_all)
+
+    def _delete_photo(self, file_path: str) -> bool:
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
+                # Удаляем и облегченную копию для Telegram, если она есть
+                self._remove_quietly(Path(file_path).with_name(f"{Path(file_path).stem}{DERIVATIVE_SUFFIX}"))
                 return True
             return False
         except Exception:
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,154 @@
+# backend/app/services/image_service.py
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+
+# Суффикс облегченной копии фото, которая отправляется в Telegram
+DERIVATIVE_SUFFIX = "_tg.jpg"
+
+
+def _render_derivative(image: Image.Image, max_side: int, quality: int) -> bytes:
+    """Поворачивает по EXIF, уменьшает до max_side и пережимает в JPEG"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def _make_file_derivative(source_path: str, target_path: str, max_side: int, quality: int) -> str:
+    """Выполняется в дочернем процессе: создает облегченную копию файла"""
+    with Image.open(source_path) as image:
+        content = _render_derivative(image, max_side, quality)
+
+    # Пишем во временный файл и переименовываем, чтобы не оставить недописанную копию
+    tmp_path = Path(f"{target_path}.tmp")
+    tmp_path.write_bytes(content)
+    tmp_path.replace(target_path)
+    return target_path
+
+
+def _make_bytes_derivative(content: bytes, max_side: int, quality: int) -> bytes:
+    """Выполняется в дочернем процессе: облегченная копия фото из байтов"""
+    with Image.open(io.BytesIO(content)) as image:
+        return _render_derivative(image, max_side, quality)
+
+
+class ImageService:
+    """
+    Обработка загруженных фото в пуле процессов: нормализация ориентации,
+    ограничение разрешения и пережатие в JPEG. Оригинал хранится без изменений,
+    в Telegram уходит облегченная копия.
+    """
+
+    def __init__(self, max_workers: int = 2, max_side: int = 1600, quality: int = 82):
+        """
+        :param max_workers: Количество процессов обработки
+        :param max_side: Максимальная длина большей стороны, px
+        :param quality: Качество JPEG (1-95)
+        """
+        self.max_workers = max_workers
+        self.max_side = max_side
+        self.quality = quality
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        """
+        Создает пул процессов. Вызывается при запуске приложения; процессы
+        запускаются через spawn: fork процесса, в котором уже работают потоки
+        (asyncio.to_thread, aiohttp), может оставить дочерний процесс в дедлоке.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Пул создается при запуске; здесь - на случай использования вне приложения (скрипты, воркер)
+        self.start()
+        return self._executor
+
+    @staticmethod
+    def get_derivative_path(photo_path: str) -> str:
+        """Путь облегченной копии рядом с оригиналом: <uuid>_tg.jpg"""
+        path = Path(photo_path)
+        return str(path.with_name(f"{path.stem}{DERIVATIVE_SUFFIX}"))
+
+    async def ensure_derivative(self, photo_path: str) -> str:
+        """
+        Возвращает путь облегченной копии фото, создавая ее при первой отправке
+        (вне запроса загрузки, из очереди доставки). Повторные попытки берут готовую копию.
+        Если обработать фото не удалось, возвращает путь оригинала.
+        """
+        derivative_path = self.get_derivative_path(photo_path)
+        if await asyncio.to_thread(Path(derivative_path).exists):
+            return derivative_path
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(),
+                _make_file_derivative,
+                photo_path,
+                derivative_path,
+                self.max_side,
+                self.quality
+            )
+        except Exception as e:
+            print(f"⚠️  Не удалось обработать фото {photo_path}, отправляем оригинал: {str(e)}")
+            return photo_path
+
+    async def downscale_photos(self, photos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Облегчает фото, переданные байтами ({'filename', 'content', 'content_type'}).
+        Фото, которые не удалось обработать, остаются как есть.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, _make_bytes_derivative, photo['content'], self.max_side, self.quality)
+                for photo in photos
+            ),
+            return_exceptions=True
+        )
+
+        processed = []
+        for photo, result in zip(photos, results):
+            if isinstance(result, Exception):
+                print(f"⚠️  Не удалось обработать фото {photo.get('filename')}, отправляем оригинал: {str(result)}")
+                processed.append(photo)
+                continue
+
+            processed.append({
+                'filename': f"{Path(photo.get('filename') or 'photo').stem}.jpg",
+                'content': result,
+                'content_type': 'image/jpeg',
+            })
+        return processed
+
+    def shutdown(self) -> None:
+        """Останавливает пул процессов"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Создание экземпляра ImageService с настройками из конфигурации
+image_service = ImageService(
+    max_workers=settings.IMAGE_PROCESS_WORKERS,
+    max_side=settings.IMAGE_MAX_SIDE,
+    quality=settings.IMAGE_JPEG_QUALITY,
+)
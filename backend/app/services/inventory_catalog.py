@@ -0,0 +1,159 @@
+# backend/app/services/inventory_catalog.py
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.database import db_helper
+from app.models.inventory_item import InventoryItem
+
+# Версия каталога: (количество товаров, максимальный updated_at)
+CatalogVersion = Tuple[int, Optional[datetime]]
+
+
+@dataclass(frozen=True)
+class CatalogItem:
+    """Товар каталога в памяти (совместим с InventoryItemResponse)"""
+    id: int
+    name: str
+    unit: str
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+class InventoryCatalog:
+    """
+    Кэш каталога товаров инвентаризации в памяти процесса.
+
+    Каталог меняется редко, а читается при каждой инвентаризации, поэтому он
+    загружается целиком. Запись через InventoryItemCRUD сбрасывает кэш сразу,
+    а изменения из других воркеров обнаруживаются по версии (количество товаров и
+    максимальный updated_at), которая проверяется не чаще check_interval секунд.
+    """
+
+    def __init__(self, check_interval: float = 30):
+        self.check_interval = check_interval
+        self._items: Dict[int, CatalogItem] = {}
+        self.version: Optional[CatalogVersion] = None
+        self._stale = True
+        # Растет при каждом сбросе: загрузка, начатая до записи, не снимет признак устаревания
+        self._generation = 0
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    async def _fetch_version(session) -> CatalogVersion:
+        result = await session.execute(
+            select(func.count(InventoryItem.id), func.max(InventoryItem.updated_at))
+        )
+        count, max_updated_at = result.one()
+        return count, max_updated_at
+
+    async def load(self) -> None:
+        """Загружает каталог целиком"""
+        generation = self._generation
+        async with db_helper.session_factory() as session:
+            version = await self._fetch_version(session)
+            # Порядок задает БД (ORDER BY name с ее сортировкой), словарь его сохраняет
+            result = await session.execute(select(InventoryItem).order_by(InventoryItem.name))
+            items = {
+                item.id: CatalogItem(
+                    id=item.id,
+                    name=item.name,
+                    unit=item.unit,
+                    is_active=item.is_active,
+                    created_at=item.created_at,
+                    updated_at=item.updated_at,
+                )
+                for item in result.scalars().all()
+            }
+
+        self._items = items
+        self.version = version
+        self._stale = generation != self._generation
+        self._checked_at = time.monotonic()
+        print(f"📦 Каталог товаров загружен: {len(items)} шт.")
+
+    async def ensure_fresh(self) -> None:
+        """Перезагружает каталог, если он сброшен или изменился в другом воркере"""
+        if not self._stale and time.monotonic() - self._checked_at < self.check_interval:
+            return
+
+        async with self._lock:
+            # Пока ждали блокировку, каталог мог обновить другой запрос
+            if not self._stale and time.monotonic() - self._checked_at < self.check_interval:
+                return
+
+            if not self._stale:
+                async with db_helper.session_factory() as session:
+                    version = await self._fetch_version(session)
+                if version == self.version:
+                    self._checked_at = time.monotonic()
+                    return
+
+            await self.load()
+
+    async def get_etag(self, *parts: object) -> str:
+        """
+        Сильный ETag для ответа на основе версии каталога (количество и max updated_at)
+        и параметров запроса.
+
+        Версия читается из базы при каждом вызове (один агрегатный запрос без загрузки
+        товаров), а не берется из кэша процесса: иначе после изменения каталога в другом
+        воркере ETag оставался бы прежним до check_interval секунд. Если версия в базе
+        отличается от кэша, каталог перезагружается, чтобы тело ответа ей соответствовало.
+        """
+        async with db_helper.session_factory() as session:
+            version = await self._fetch_version(session)
+
+        if self._stale or version != self.version:
+            async with self._lock:
+                if self._stale or version != self.version:
+                    await self.load()
+        else:
+            self._checked_at = time.monotonic()
+
+        raw = "|".join(str(part) for part in (*self.version, *parts))
+        return f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+    def invalidate(self) -> None:
+        """Сбрасывает кэш после изменения каталога"""
+        self._generation += 1
+        self._stale = True
+
+    async def get_items(self) -> Dict[int, CatalogItem]:
+        """Все товары каталога: id -> товар"""
+        await self.ensure_fresh()
+        return self._items
+
+    async def get_item(self, item_id: int) -> Optional[CatalogItem]:
+        return (await self.get_items()).get(item_id)
+
+    async def list_items(self, is_active: Optional[bool] = None) -> List[CatalogItem]:
+        """
+        Товары по названию с фильтром по активности. Порядок тот же, что у
+        ORDER BY name в БД (правила сортировки БД, а не Python: для кириллицы,
+        регистра и "ё" они различаются).
+        """
+        items = (await self.get_items()).values()
+        if is_active is not None:
+            return [item for item in items if item.is_active == is_active]
+        return list(items)
+
+    async def get_missing_ids(self, item_ids: List[int]) -> List[int]:
+        """ID товаров, которых нет в каталоге или которые неактивны"""
+        items = await self.get_items()
+        return sorted({
+            item_id for item_id in item_ids
+            if item_id not in items or not items[item_id].is_active
+        })
+
+
+# Создание экземпляра InventoryCatalog с настройками из конфигурации
+inventory_catalog = InventoryCatalog(check_interval=settings.INVENTORY_CATALOG_CHECK_INTERVAL)
@@ -0,0 +1,391 @@
+# backend/app/services/outbox.py
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import db_helper
+from app.core.metrics import metrics_registry, telegram_delivery_duration
+from app.models import TelegramOutbox
+from app.services.telegram_service import get_telegram_service
+from app.services.task_supervisor import task_supervisor
+
+# Обработчик доставки: (report_id, payload) -> успешно ли отправлено
+DeliveryHandler = Callable[[int, Dict[str, Any]], Awaitable[bool]]
+
+
+class OutboxDispatcher:
+    """
+    Фоновый диспетчер очереди доставки в Telegram.
+
+    Отчет и запись в telegram_outbox сохраняются в одной транзакции, а диспетчер
+    вычитывает очередь с ограниченной параллельностью, повторяет неудачные отправки
+    с экспоненциальной задержкой и помечает доставленные записи.
+    """
+
+    def __init__(
+            self,
+            poll_interval: float = 5,
+            batch_size: int = 20,
+            concurrency: int = 4,
+            max_attempts: int = 10,
+            backoff_base: float = 5,
+            backoff_max: float = 600,
+            lease_seconds: float = 120,
+            delivery_timeout: float = 90,
+    ):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.delivery_timeout = delivery_timeout
+
+        self._handlers: Optional[Dict[str, DeliveryHandler]] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        # Количество доставок, выполняемых прямо сейчас
+        self.in_flight = 0
+        # Записей в статусе failed (обновляется циклом диспетчера) и переходов в failed этим процессом
+        self.failed_count = 0
+        self.failed_total = 0
+
+    def enqueue(
+            self,
+            db: AsyncSession,
+            report_type: str,
+            report_id: int,
+            payload: Optional[Dict[str, Any]] = None
+    ) -> TelegramOutbox:
+        """
+        Добавляет запись в очередь доставки в текущей транзакции.
+        Коммит выполняет вызывающий код вместе с самим отчетом.
+        """
+        entry = TelegramOutbox(
+            report_type=report_type,
+            report_id=report_id,
+            payload=payload or {},
+            status="pending",
+            attempts=0,
+            next_attempt_at=datetime.now(timezone.utc),
+        )
+        db.add(entry)
+        return entry
+
+    def notify(self) -> None:
+        """Будит диспетчер сразу после коммита нового отчета"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        """Запускает фоновый цикл обработки очереди"""
+        if self._task is not None and not self._task.done():
+            return
+
+        self._stopping = False
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="telegram-outbox-dispatcher")
+        print(f"📬 Диспетчер очереди Telegram запущен (параллельность: {self.concurrency})")
+
+    async def stop(self, timeout: float = 0) -> None:
+        """
+        Останавливает фоновый цикл; недоставленные записи остаются в очереди.
+
+        :param timeout: Сколько секунд дать начатым доставкам завершиться, прежде чем
+                        прервать их (прерванные будут повторены после истечения аренды)
+        """
+        self._stopping = True
+        if self._task is None:
+            return
+
+        self.notify()
+        if timeout > 0 and not self._task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), timeout=timeout)
+            except asyncio.TimeoutError:
+                print(f"⚠️  Доставки в Telegram не завершились за {timeout:.0f} сек, прерываем: {self.in_flight}")
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        print("📭 Диспетчер очереди Telegram остановлен")
+
+    async def _run(self) -> None:
+        """Основной цикл: вычитывает очередь, затем ждет уведомления или интервала опроса"""
+        while not self._stopping:
+            try:
+                processed = await self.drain_once()
+                # Если пачка была полной, сразу берем следующую
+                if processed >= self.batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Ошибка обработки очереди Telegram: {str(e)}")
+
+            await self._refresh_failed_count()
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        """
+        Забирает одну пачку готовых к отправке записей и доставляет их.
+
+        :return: Количество обработанных записей
+        """
+        # Пока Telegram не настроен, записи просто копятся в очереди
+        if not get_telegram_service().enabled:
+            return 0
+
+        jobs = await self._claim_batch()
+        if not jobs:
+            return 0
+
+        await asyncio.gather(*(self._deliver(*job) for job in jobs))
+        return len(jobs)
+
+    async def _claim_batch(self) -> List[Tuple[int, str, int, Dict[str, Any], int]]:
+        """
+        Захватывает пачку записей: сдвигает next_attempt_at на время аренды,
+        чтобы другие воркеры их не взяли. Если процесс упадет во время отправки,
+        аренда истечет и запись будет обработана повторно.
+        """
+        now = datetime.now(timezone.utc)
+
+        async with db_helper.session_factory() as session:
+            result = await session.execute(
+                select(TelegramOutbox)
+                .where(
+                    TelegramOutbox.status == "pending",
+                    TelegramOutbox.next_attempt_at <= now
+                )
+                .order_by(TelegramOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            entries = result.scalars().all()
+
+            jobs = []
+            for entry in entries:
+                entry.next_attempt_at = now + timedelta(seconds=self.lease_seconds)
+                jobs.append((entry.id, entry.report_type, entry.report_id, dict(entry.payload or {}), entry.attempts))
+
+            await session.commit()
+
+        return jobs
+
+    async def _deliver(
+            self,
+            entry_id: int,
+            report_type: str,
+            report_id: int,
+            payload: Dict[str, Any],
+            attempts: int
+    ) -> None:
+        """Доставляет одну запись и сохраняет результат"""
+        async with self._semaphore:
+            handler = self._get_handlers().get(report_type)
+            error: Optional[str] = None
+            started = time.perf_counter()
+
+            if handler is None:
+                error = f"Неизвестный тип отчета: {report_type}"
+            else:
+                # Повторная доставка того же отчета не создаст второе сообщение в чате
+                payload = {**payload, "idempotency_key": f"{report_type}:{report_id}"}
+
+                async def attempt():
+                    try:
+                        success = await asyncio.wait_for(
+                            handler(report_id, payload),
+                            timeout=self.delivery_timeout
+                        )
+                    except asyncio.TimeoutError:
+                        raise RuntimeError(f"Таймаут отправки ({self.delivery_timeout} сек)")
+                    if not success:
+                        raise RuntimeError("Telegram не подтвердил отправку")
+
+                self.in_flight += 1
+                try:
+                    # Доставка видна в /tasks, пока выполняется, и в списке ошибок, если не удалась
+                    await task_supervisor.run(attempt(), kind="telegram_delivery", name=f"{report_type}:{report_id}")
+                except Exception as e:
+                    error = str(e) or e.__class__.__name__
+                finally:
+                    self.in_flight -= 1
+
+            telegram_delivery_duration.observe(
+                time.perf_counter() - started,
+                report_type=report_type,
+                result="ok" if error is None else "error"
+            )
+            await self._save_result(entry_id, report_type, report_id, attempts + 1, error)
+
+    async def _save_result(
+            self,
+            entry_id: int,
+            report_type: str,
+            report_id: int,
+            attempts: int,
+            error: Optional[str]
+    ) -> None:
+        """Помечает запись доставленной или планирует повтор с задержкой"""
+        now = datetime.now(timezone.utc)
+
+        if error is None:
+            values = {"status": "sent", "attempts": attempts, "sent_at": now, "last_error": None}
+            print(f"✅ Очередь Telegram: {report_type} ID {report_id} доставлен")
+        elif attempts >= self.max_attempts:
+            values = {"status": "failed", "attempts": attempts, "last_error": error}
+            self.failed_total += 1
+            print(f"❌ Очередь Telegram: {report_type} ID {report_id} не доставлен после {attempts} попыток: {error}")
+        else:
+            delay = self._backoff_delay(attempts)
+            values = {
+                "attempts": attempts,
+                "last_error": error,
+                "next_attempt_at": now + timedelta(seconds=delay),
+            }
+            print(f"⚠️  Очередь Telegram: {report_type} ID {report_id} попытка {attempts} неудачна "
+                  f"({error}), повтор через {delay:.0f} сек")
+
+        try:
+            async with db_helper.session_factory() as session:
+                await session.execute(
+                    update(TelegramOutbox).where(TelegramOutbox.id == entry_id).values(**values)
+                )
+                await session.commit()
+        except Exception as e:
+            # Аренда истечет, и запись будет обработана повторно
+            print(f"⚠️  Не удалось сохранить результат доставки {report_type} ID {report_id}: {str(e)}")
+
+    async def _refresh_failed_count(self) -> None:
+        """Пересчитывает записи в статусе failed для метрики (по индексу status, next_attempt_at)"""
+        try:
+            async with db_helper.session_factory() as session:
+                self.failed_count = await session.scalar(
+                    select(func.count()).select_from(TelegramOutbox).where(TelegramOutbox.status == "failed")
+                ) or 0
+        except Exception as e:
+            print(f"⚠️  Не удалось посчитать недоставленные записи очереди Telegram: {str(e)}")
+
+    @staticmethod
+    async def list_failed(
+            db: AsyncSession,
+            report_type: Optional[str] = None,
+            limit: int = 100
+    ) -> List[TelegramOutbox]:
+        """Записи, которые не удалось доставить за max_attempts попыток, новые первыми"""
+        query = select(TelegramOutbox).where(TelegramOutbox.status == "failed")
+        if report_type:
+            query = query.where(TelegramOutbox.report_type == report_type)
+
+        result = await db.execute(query.order_by(TelegramOutbox.id.desc()).limit(limit))
+        return list(result.scalars().all())
+
+    async def requeue_failed(
+            self,
+            db: AsyncSession,
+            ids: Optional[List[int]] = None,
+            report_type: Optional[str] = None
+    ) -> int:
+        """
+        Возвращает недоставленные записи в очередь со сброшенным счетчиком попыток.
+
+        :param ids: Какие записи вернуть (по умолчанию - все failed)
+        :param report_type: Вернуть только записи этого типа отчета
+        :return: Количество возвращенных в очередь записей
+        """
+        statement = update(TelegramOutbox).where(TelegramOutbox.status == "failed")
+        if ids:
+            statement = statement.where(TelegramOutbox.id.in_(ids))
+        if report_type:
+            statement = statement.where(TelegramOutbox.report_type == report_type)
+
+        result = await db.execute(
+            statement.values(status="pending", attempts=0, next_attempt_at=datetime.now(timezone.utc))
+        )
+        await db.commit()
+
+        requeued = result.rowcount or 0
+        if requeued:
+            self.failed_count = max(0, self.failed_count - requeued)
+            print(f"🔁 Очередь Telegram: возвращено на доставку записей: {requeued}")
+            self.notify()
+        return requeued
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "in_flight": self.in_flight,
+            "failed": self.failed_count,
+            "failed_total": self.failed_total,
+        }
+
+    def _backoff_delay(self, attempts: int) -> float:
+        """Экспоненциальная задержка с полным джиттером"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        return random.uniform(delay / 2, delay)
+
+    def _get_handlers(self) -> Dict[str, DeliveryHandler]:
+        """Обработчики доставки по типу отчета (импорт отложен из-за циклических зависимостей)"""
+        if self._handlers is None:
+            from app.crud import (
+                ShiftReportCRUD, DailyInventoryCrud, DailyInventoryV2CRUD, WriteoffTransferCRUD, ReportOnGoodCRUD
+            )
+
+            self._handlers = {
+                "shift_report": ShiftReportCRUD().deliver_to_telegram,
+                "daily_inventory": DailyInventoryCrud().deliver_to_telegram,
+                "daily_inventory_v2": DailyInventoryV2CRUD().deliver_to_telegram,
+                "writeoff_transfer": WriteoffTransferCRUD().deliver_to_telegram,
+                "report_on_goods": ReportOnGoodCRUD().deliver_to_telegram,
+            }
+        return self._handlers
+
+
+# Создание экземпляра OutboxDispatcher с настройками из конфигурации
+outbox_dispatcher = OutboxDispatcher(
+    poll_interval=settings.OUTBOX_POLL_INTERVAL,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    concurrency=settings.OUTBOX_CONCURRENCY,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    backoff_base=settings.OUTBOX_BACKOFF_BASE,
+    backoff_max=settings.OUTBOX_BACKOFF_MAX,
+    lease_seconds=settings.OUTBOX_LEASE_SECONDS,
+    delivery_timeout=settings.OUTBOX_DELIVERY_TIMEOUT,
+)
+
+metrics_registry.gauge_callback(
+    "telegram_outbox_in_flight",
+    "Записей очереди Telegram, доставляемых прямо сейчас",
+    lambda: {(): outbox_dispatcher.in_flight}
+)
+metrics_registry.gauge_callback(
+    "telegram_outbox_failed",
+    "Записей очереди Telegram в статусе failed (не доставлены за максимум попыток)",
+    lambda: {(): outbox_dispatcher.failed_count}
+)
+metrics_registry.gauge_callback(
+    "telegram_outbox_failed_total",
+    "Записей очереди Telegram, переведенных в failed этим процессом",
+    lambda: {(): outbox_dispatcher.failed_total},
+    metric_type="counter"
+)
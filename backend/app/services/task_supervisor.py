@@ -0,0 +1,153 @@
+# backend/app/services/task_supervisor.py
+import asyncio
+import itertools
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Deque, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+
+background_task_duration = metrics_registry.histogram(
+    "background_task_duration_seconds",
+    "Время выполнения фоновых задач",
+    labelnames=("kind", "outcome")
+)
+
+
+class TaskSupervisor:
+    """
+    Реестр фоновых задач процесса (доставки в Telegram, установка веб-хука и т.п.).
+
+    Держит ссылки на задачи (иначе сборщик мусора может удалить задачу на середине),
+    ограничивает число одновременно выполняемых задач семафором, считает длительность
+    и исход по типу задачи и хранит последние ошибки для /tasks.
+    """
+
+    def __init__(self, max_concurrency: int = 20, failure_history: int = 100):
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._ids = itertools.count(1)
+
+        self._tasks: Set[asyncio.Task] = set()
+        self._running: Dict[int, Dict[str, Any]] = {}
+        self.recent_failures: Deque[Dict[str, Any]] = deque(maxlen=failure_history)
+        # Счетчики по типу задачи: исход -> количество
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def spawn(self, coro: Awaitable[Any], kind: str, name: Optional[str] = None) -> asyncio.Task:
+        """
+        Запускает задачу в фоне. Исключения не теряются: они логируются
+        и попадают в recent_failures.
+        """
+        task = asyncio.create_task(self._supervise(coro, kind, name, reraise=False), name=f"{kind}:{name or ''}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def run(self, coro: Awaitable[Any], kind: str, name: Optional[str] = None) -> Any:
+        """Выполняет задачу с учетом в реестре и ждет результат (исключения пробрасываются)"""
+        return await self._supervise(coro, kind, name, reraise=True)
+
+    async def _supervise(self, coro: Awaitable[Any], kind: str, name: Optional[str], reraise: bool) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        task_id = next(self._ids)
+        info = {
+            "id": task_id,
+            "kind": kind,
+            "name": name,
+            "state": "waiting",
+            "created_at": datetime.now(timezone.utc),
+            "started_at": None,
+        }
+        self._running[task_id] = info
+        kind_stats = self.stats.setdefault(kind, {"ok": 0, "error": 0, "cancelled": 0})
+
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            async with self._semaphore:
+                info["state"] = "running"
+                info["started_at"] = datetime.now(timezone.utc)
+                started = time.perf_counter()
+                return await coro
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            outcome = "error"
+            self.recent_failures.append({
+                "id": task_id,
+                "kind": kind,
+                "name": name,
+                "error": str(e) or e.__class__.__name__,
+                "finished_at": datetime.now(timezone.utc),
+                "duration_seconds": round(time.perf_counter() - started, 3),
+            })
+            if reraise:
+                raise
+            print(f"❌ Фоновая задача {kind} {name or ''} завершилась ошибкой: {str(e)}")
+        finally:
+            # Корутина могла не запуститься (отмена в ожидании семафора)
+            if info["state"] == "waiting" and asyncio.iscoroutine(coro):
+                coro.close()
+            del self._running[task_id]
+            kind_stats[outcome] += 1
+            background_task_duration.observe(time.perf_counter() - started, kind=kind, outcome=outcome)
+
+    async def drain(self, timeout: float = 0) -> None:
+        """Ждет фоновые задачи (spawn) не дольше timeout секунд и отменяет оставшиеся"""
+        tasks = list(self._tasks)
+        if not tasks:
+            return
+
+        if timeout > 0:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+        else:
+            pending = [task for task in tasks if not task.done()]
+
+        if pending:
+            print(f"⚠️  Прерываем незавершенные фоновые задачи: {len(pending)}")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def list_in_flight(self) -> List[Dict[str, Any]]:
+        """Выполняемые и ожидающие очереди задачи, самые старые первыми"""
+        now = datetime.now(timezone.utc)
+        return [
+            {
+                **info,
+                "running_seconds": round((now - info["started_at"]).total_seconds(), 3) if info["started_at"] else 0.0,
+            }
+            for info in self._running.values()
+        ]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        running = sum(1 for info in self._running.values() if info["state"] == "running")
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": running,
+            "waiting": len(self._running) - running,
+            "stats": self.stats,
+        }
+
+
+# Создание экземпляра TaskSupervisor с настройками из конфигурации
+task_supervisor = TaskSupervisor(
+    max_concurrency=settings.BACKGROUND_TASKS_MAX_CONCURRENCY,
+    failure_history=settings.BACKGROUND_TASKS_FAILURE_HISTORY,
+)
+
+metrics_registry.gauge_callback(
+    "background_tasks_in_flight",
+    "Фоновых задач, выполняемых и ожидающих очереди",
+    lambda: {
+        (state,): value
+        for state, value in task_supervisor.get_metrics().items() if state in ("running", "waiting")
+    },
+    labelnames=("state",)
+)
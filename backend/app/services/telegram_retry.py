@@ -0,0 +1,110 @@
+# backend/app/services/telegram_retry.py
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from typing import FrozenSet
+
+import aiohttp
+
+from app.core.config import settings
+
+# Методы, повтор которых безопасен: они не создают сообщений в чате
+IDEMPOTENT_METHODS: FrozenSet[str] = frozenset({
+    "answerCallbackQuery",
+    "setWebhook",
+    "deleteWebhook",
+    "getWebhookInfo",
+    "getUpdates",
+    "getMe",
+})
+
+# Ответы шлюза Telegram: запрос не дошел до бота, повтор не создаст дубль
+SAFE_RETRY_STATUSES: FrozenSet[int] = frozenset({502, 503, 504})
+# Запрос мог быть выполнен - повторяем только идемпотентные методы
+AMBIGUOUS_RETRY_STATUSES: FrozenSet[int] = frozenset({500})
+
+
+class RetryPolicy:
+    """Политика повторов запросов к Telegram: экспоненциальная задержка с джиттером"""
+
+    def __init__(
+            self,
+            max_attempts: int = 4,
+            backoff_base: float = 0.5,
+            backoff_max: float = 8,
+            retry_ambiguous: bool = False,
+    ):
+        """
+        :param max_attempts: Максимум попыток, включая первую
+        :param backoff_base: Задержка перед первым повтором, сек
+        :param backoff_max: Верхняя граница задержки, сек
+        :param retry_ambiguous: Повторять ли отправку сообщений, которые могли дойти до Telegram
+                                (таймаут чтения, обрыв соединения) - возможен дубль в чате
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_ambiguous = retry_ambiguous
+
+    def delay(self, attempt: int) -> float:
+        """Задержка перед повтором после попытки attempt (полный джиттер)"""
+        cap = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+    def is_retryable_status(self, status: int, api_method: str) -> bool:
+        """Можно ли повторить запрос после HTTP ответа со статусом status"""
+        if status in SAFE_RETRY_STATUSES:
+            return True
+        if status in AMBIGUOUS_RETRY_STATUSES:
+            return api_method in IDEMPOTENT_METHODS or self.retry_ambiguous
+        return False
+
+    def is_retryable_error(self, error: BaseException, api_method: str) -> bool:
+        """Можно ли повторить запрос после сетевой ошибки"""
+        # Соединение не установлено - запрос точно не отправлен
+        if isinstance(error, (aiohttp.ClientConnectorError, aiohttp.ConnectionTimeoutError)):
+            return True
+
+        # Таймаут чтения, обрыв соединения и т.п. - Telegram мог успеть выполнить запрос
+        if isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, OSError)):
+            return api_method in IDEMPOTENT_METHODS or self.retry_ambiguous
+
+        return False
+
+
+class DeliveredKeys:
+    """
+    Ключи идемпотентности успешно отправленных сообщений.
+    Ограниченный по размеру и времени жизни кэш: повторная доставка того же отчета
+    (например, из очереди после сбоя сохранения статуса) не создаст дубль в чате.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 24 * 60 * 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._keys: "OrderedDict[str, float]" = OrderedDict()
+
+    def __contains__(self, key: str) -> bool:
+        delivered_at = self._keys.get(key)
+        if delivered_at is None:
+            return False
+        if time.monotonic() - delivered_at > self.ttl:
+            del self._keys[key]
+            return False
+        return True
+
+    def add(self, key: str) -> None:
+        self._keys[key] = time.monotonic()
+        self._keys.move_to_end(key)
+        while len(self._keys) > self.max_size:
+            self._keys.popitem(last=False)
+
+
+# Создание экземпляра RetryPolicy с настройками из конфигурации
+retry_policy = RetryPolicy(
+    max_attempts=settings.TELEGRAM_RETRY_MAX_ATTEMPTS,
+    backoff_base=settings.TELEGRAM_RETRY_BACKOFF_BASE,
+    backoff_max=settings.TELEGRAM_RETRY_BACKOFF_MAX,
+    retry_ambiguous=settings.TELEGRAM_RETRY_AMBIGUOUS,
+)
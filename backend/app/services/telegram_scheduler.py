@@ -0,0 +1,242 @@
+# backend/app/services/telegram_scheduler.py
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+
+# Приоритеты отправки: меньше - важнее
+PRIORITY_HIGH = 0  # Отчеты смены и ответы пользователям
+PRIORITY_NORMAL = 1  # Остальные отчеты
+PRIORITY_LOW = 2  # Досылка фотографий
+
+
+class TokenBucket:
+    """Корзина токенов: rate токенов в секунду, не больше capacity"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        # Telegram может попросить подождать (retry_after) - до этого момента корзина закрыта
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def time_until_available(self, now: float, cost: float = 1) -> float:
+        """Сколько секунд ждать, пока можно будет потратить cost токенов"""
+        self._refill(now)
+        # Запрос дороже всей корзины (медиа-группа) пропускаем при полной корзине
+        need = min(cost, self.capacity)
+        wait = 0.0 if self.tokens >= need else (need - self.tokens) / self.rate
+        return max(wait, self.blocked_until - now)
+
+    def consume(self, now: float, cost: float = 1) -> None:
+        self._refill(now)
+        # Баланс может уйти в минус - следующие запросы подождут дольше
+        self.tokens -= cost
+
+    def block(self, now: float, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class TelegramSendScheduler:
+    """
+    Центральный планировщик исходящих запросов к Telegram.
+
+    Все сообщения ставятся в очередь с приоритетом и выпускаются только когда
+    в глобальной корзине и в корзине конкретного чата есть токены. Ответ 429
+    закрывает корзину чата на retry_after секунд.
+    """
+
+    def __init__(
+            self,
+            global_rate: float = 25,
+            global_burst: float = 30,
+            group_rate_per_minute: float = 20,
+            group_burst: float = 3,
+            private_rate: float = 1,
+            private_burst: float = 1,
+    ):
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.group_rate = group_rate_per_minute / 60
+        self.group_burst = group_burst
+        self.private_rate = private_rate
+        self.private_burst = private_burst
+
+        self._chat_buckets: Dict[str, TokenBucket] = {}
+        # Элементы очереди: (приоритет, порядковый номер, chat_id, стоимость, future, время постановки)
+        self._queue: List[Tuple[int, int, str, float, asyncio.Future, float]] = []
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Метрики
+        self.granted_total = 0
+        self.throttled_total = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _get_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            # Отрицательный chat_id - группа или канал, у них свой лимит
+            if chat_id.startswith("-"):
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.private_rate, self.private_burst)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _ensure_worker(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="telegram-send-scheduler")
+
+    async def acquire(self, chat_id: Any, priority: int = PRIORITY_NORMAL, cost: float = 1) -> float:
+        """
+        Ждет своей очереди на отправку в чат.
+
+        :param chat_id: ID чата Telegram
+        :param priority: Приоритет (PRIORITY_HIGH / PRIORITY_NORMAL / PRIORITY_LOW)
+        :param cost: Сколько сообщений создаст запрос (для медиа-группы - число фото)
+        :return: Время ожидания в очереди, сек
+        """
+        self._ensure_worker()
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._queue,
+            (priority, next(self._counter), str(chat_id), cost, future, time.monotonic())
+        )
+        self._wakeup.set()
+        return await future
+
+    def penalize(self, chat_id: Any, retry_after: float) -> None:
+        """Закрывает корзину чата после ответа 429 Too Many Requests"""
+        self.throttled_total += 1
+        self._get_bucket(str(chat_id)).block(time.monotonic(), retry_after)
+        print(f"⏳ Telegram ограничил отправку в чат {chat_id}, пауза {retry_after} сек")
+
+    async def _run(self) -> None:
+        """Выпускает запросы из очереди по мере появления токенов"""
+        while True:
+            now = time.monotonic()
+            next_wait: Optional[float] = None
+            granted = False
+
+            # Очередь небольшая: ищем самый приоритетный запрос, чей чат готов к отправке
+            for entry in sorted(self._queue):
+                priority, _, chat_id, cost, future, enqueued_at = entry
+                if future.done():
+                    self._queue.remove(entry)
+                    continue
+
+                bucket = self._get_bucket(chat_id)
+                wait = max(
+                    self.global_bucket.time_until_available(now, cost),
+                    bucket.time_until_available(now, cost)
+                )
+                if wait <= 0:
+                    self.global_bucket.consume(now, cost)
+                    bucket.consume(now, cost)
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+
+                    waited = now - enqueued_at
+                    self.granted_total += 1
+                    self.wait_seconds_total += waited
+                    self.wait_seconds_max = max(self.wait_seconds_max, waited)
+                    future.set_result(waited)
+                    granted = True
+                    break
+
+                next_wait = wait if next_wait is None else min(next_wait, wait)
+
+            if granted:
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=next_wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Глубина очереди и время ожидания"""
+        depth_by_priority = {"high": 0, "normal": 0, "low": 0}
+        names = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_LOW: "low"}
+        for priority, *_ in self._queue:
+            depth_by_priority[names.get(priority, "low")] += 1
+
+        return {
+            "queue_depth": len(self._queue),
+            "queue_depth_by_priority": depth_by_priority,
+            "granted_total": self.granted_total,
+            "throttled_total": self.throttled_total,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "wait_seconds_avg": round(self.wait_seconds_total / self.granted_total, 3) if self.granted_total else 0.0,
+            "wait_seconds_max": round(self.wait_seconds_max, 3),
+        }
+
+    async def close(self) -> None:
+        """Останавливает планировщик и отменяет ожидающие запросы"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for *_, future, _ in self._queue:
+            if not future.done():
+                future.cancel()
+        self._queue.clear()
+
+
+# Создание экземпляра TelegramSendScheduler с настройками из конфигурации
+send_scheduler = TelegramSendScheduler(
+    global_rate=settings.TELEGRAM_GLOBAL_RATE,
+    global_burst=settings.TELEGRAM_GLOBAL_BURST,
+    group_rate_per_minute=settings.TELEGRAM_GROUP_RATE_PER_MINUTE,
+    group_burst=settings.TELEGRAM_GROUP_BURST,
+    private_rate=settings.TELEGRAM_PRIVATE_RATE,
+    private_burst=settings.TELEGRAM_PRIVATE_BURST,
+)
+
+metrics_registry.gauge_callback(
+    "telegram_send_queue_depth",
+    "Сообщений в очереди планировщика отправки",
+    lambda: {
+        (priority,): depth
+        for priority, depth in send_scheduler.get_metrics()["queue_depth_by_priority"].items()
+    },
+    labelnames=("priority",)
+)
+metrics_registry.gauge_callback(
+    "telegram_send_throttled_total",
+    "Ответов 429 от Telegram",
+    lambda: {(): send_scheduler.throttled_total},
+    metric_type="counter"
+)
+metrics_registry.gauge_callback(
+    "telegram_send_wait_seconds_total",
+    "Суммарное ожидание в очереди планировщика отправки",
+    lambda: {(): send_scheduler.wait_seconds_total},
+    metric_type="counter"
+)
+metrics_registry.gauge_callback(
+    "telegram_send_granted_total",
+    "Сообщений, выпущенных планировщиком отправки",
+    lambda: {(): send_scheduler.granted_total},
+    metric_type="counter"
+)
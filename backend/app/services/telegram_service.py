@@ -1,23 +1,42 @@
 # backend/app/services/telegram_service.py
 from datetime import datetime
 from zoneinfo import ZoneInfo
+import asyncio
+import inspect
+import time
 import aiohttp
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Union
 from pathlib import Path
 import json
 import socket
 from sqlalchemy.ext.asyncio import AsyncSession
 import io
 from app.core.config import settings
-from app.schemas.telegram import TelegramMessage
+from app.core.constants import DAILY_INVENTORY_DRINKS, DAILY_INVENTORY_FOOD
+from app.core.http_client import http_helper
+from app.core.metrics import telegram_api_duration
+from app.schemas.telegram import TelegramMessage, TelegramUpdate
+from app.services.telegram_scheduler import send_scheduler, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+from app.services.telegram_retry import retry_policy, DeliveredKeys
+from app.services.update_dedup import update_deduplicator
 
 
 class TelegramService:
     def __init__(self):
         self.bot_token = settings.TELEGRAM_BOT_TOKEN
         self.chat_id = settings.TELEGRAM_CHAT_ID
-        self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
+        self.base_url = f"{settings.TELEGRAM_API_URL.rstrip('/')}/bot{self.bot_token}"
         self.mini_app_url = settings.MINI_APP_URL
+        # Общий для процесса планировщик отправки с учетом лимитов Telegram
+        self.scheduler = send_scheduler
+        # Повторы при сбоях и защита от повторной отправки одного и того же отчета
+        self.retry_policy = retry_policy
+        self.delivered_keys = DeliveredKeys(
+            max_size=settings.TELEGRAM_IDEMPOTENCY_CACHE_SIZE,
+            ttl=settings.TELEGRAM_IDEMPOTENCY_TTL
+        )
+        # Повторно доставленные Telegram обновления (по update_id)
+        self.update_dedup = update_deduplicator
 
         # Проверяем, что токен и chat_id заданы
         if not self.bot_token or self.bot_token == "your_bot_token_here":
@@ -57,7 +76,19 @@ class TelegramService:
 
         return None
 
-    async def handle_message(self, message: TelegramMessage, db: AsyncSession):
+    async def handle_update(self, update: TelegramUpdate, db: Optional[AsyncSession] = None):
+        """Передает обновление обработчику сообщения или нажатия на кнопку"""
+        if not await self.update_dedup.claim(update.update_id, db):
+            print(f"♻️  Обновление {update.update_id} уже обработано, пропускаем")
+            return
+
+        if update.message:
+            await self.handle_message(update.message, db)
+
+        if update.callback_query:
+            await self.handle_callback_query(update.callback_query, db)
+
+    async def handle_message(self, message: TelegramMessage, db: Optional[AsyncSession] = None):
         """Обрабатывает входящие сообщения от пользователей"""
         if not self.enabled:
             return
@@ -82,7 +113,7 @@ class TelegramService:
         except Exception as e:
             print(f"❌ Ошибка обработки сообщения: {str(e)}")
 
-    async def handle_callback_query(self, callback_query: Dict[str, Any], db: AsyncSession):
+    async def handle_callback_query(self, callback_query: Dict[str, Any], db: Optional[AsyncSession] = None):
         """Обрабатывает нажатия на inline кнопки"""
         if not self.enabled:
             return
@@ -163,7 +194,7 @@ class TelegramService:
 
 <b>Поддержка:</b> @your_support_username"""
 
-        await self._send_message(chat_id, help_message)
+        await self._send_message(chat_id, help_message, priority=PRIORITY_HIGH)
 
     async def _handle_status_command(self, chat_id: int):
         """Обрабатывает команду /status"""
@@ -178,13 +209,11 @@ class TelegramService:
 
 <b>Последнее обновление:</b> Сейчас"""
 
-        await self._send_message(chat_id, status_message)
+        await self._send_message(chat_id, status_message, priority=PRIORITY_HIGH)
 
     async def _send_message_with_keyboard(self, chat_id: int, text: str, keyboard: Dict[str, Any]):
         """Отправляет сообщение с inline клавиатурой"""
         try:
-            url = f"{self.base_url}/sendMessage"
-
             data = {
                 'chat_id': chat_id,
                 'text': text,
@@ -192,14 +221,15 @@ class TelegramService:
                 'reply_markup': json.dumps(keyboard)
             }
 
-            timeout = aiohttp.ClientTimeout(total=10, connect=5)
-
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, data=data) as response:
-                    if response.status != 200:
-                        response_text = await response.text()
-                        print(f"Telegram API ошибка (клавиатура): {response.status} - {response_text}")
-                    return response.status == 200
+            result = await self._call_api(
+                "sendMessage",
+                data,
+                timeout=aiohttp.ClientTimeout(total=10, connect=5),
+                chat_id=chat_id,
+                priority=PRIORITY_HIGH,
+                error_label="клавиатура"
+            )
+            return result is not None
 
         except Exception as e:
             print(f"Ошибка отправки сообщения с клавиатурой: {str(e)}")
@@ -208,18 +238,18 @@ class TelegramService:
     async def _answer_callback_query(self, query_id: str, text: str = ""):
         """Отвечает на callback query"""
         try:
-            url = f"{self.base_url}/answerCallbackQuery"
-
             data = {
                 'callback_query_id': query_id,
                 'text': text
             }
 
-            timeout = aiohttp.ClientTimeout(total=5, connect=3)
-
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, data=data) as response:
-                    return response.status == 200
+            result = await self._call_api(
+                "answerCallbackQuery",
+                data,
+                timeout=aiohttp.ClientTimeout(total=5, connect=3),
+                error_label="callback query"
+            )
+            return result is not None
 
         except Exception as e:
             print(f"Ошибка ответа на callback query: {str(e)}")
@@ -229,28 +259,29 @@ class TelegramService:
     async def set_webhook(self, webhook_url: str) -> bool:
         """Устанавливает веб-хук"""
         try:
-            url = f"{self.base_url}/setWebhook"
-
             data = {
                 'url': webhook_url,
                 'allowed_updates': json.dumps(['message', 'callback_query'])
             }
+            if settings.WEBHOOK_SECRET_TOKEN:
+                # Telegram будет присылать его в заголовке X-Telegram-Bot-Api-Secret-Token
+                data['secret_token'] = settings.WEBHOOK_SECRET_TOKEN
+
+            result = await self._call_api(
+                "setWebhook",
+                data,
+                timeout=aiohttp.ClientTimeout(total=10, connect=5),
+                error_label="установка веб-хука"
+            )
+            if result is None:
+                return False
 
-            timeout = aiohttp.ClientTimeout(total=10, connect=5)
+            if result.get('ok'):
+                print(f"✅ Веб-хук установлен: {webhook_url}")
+                return True
 
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, data=data) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if result.get('ok'):
-                            print(f"✅ Веб-хук установлен: {webhook_url}")
-                            return True
-                        else:
-                            print(f"❌ Ошибка установки веб-хука: {result.get('description')}")
-                    else:
-                        response_text = await response.text()
-                        print(f"❌ HTTP ошибка при установке веб-хука: {response.status} - {response_text}")
-                    return False
+            print(f"❌ Ошибка установки веб-хука: {result.get('description')}")
+            return False
 
         except Exception as e:
             print(f"❌ Исключение при установке веб-хука: {str(e)}")
@@ -259,20 +290,20 @@ class TelegramService:
     async def delete_webhook(self) -> bool:
         """Удаляет веб-хук"""
         try:
-            url = f"{self.base_url}/deleteWebhook"
+            result = await self._call_api(
+                "deleteWebhook",
+                timeout=aiohttp.ClientTimeout(total=10, connect=5),
+                error_label="удаление веб-хука"
+            )
+            if result is None:
+                return False
 
-            timeout = aiohttp.ClientTimeout(total=10, connect=5)
+            if result.get('ok'):
+                print("✅ Веб-хук удален")
+                return True
 
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if result.get('ok'):
-                            print("✅ Веб-хук удален")
-                            return True
-                        else:
-                            print(f"❌ Ошибка удаления веб-хука: {result.get('description')}")
-                    return False
+            print(f"❌ Ошибка удаления веб-хука: {result.get('description')}")
+            return False
 
         except Exception as e:
             print(f"❌ Ошибка удаления веб-хука: {str(e)}")
@@ -281,25 +312,49 @@ class TelegramService:
     async def get_webhook_info(self) -> Dict[str, Any]:
         """Получает информацию о веб-хуке"""
         try:
-            url = f"{self.base_url}/getWebhookInfo"
-
-            timeout = aiohttp.ClientTimeout(total=10, connect=5)
-
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if result.get('ok'):
-                            return result.get('result', {})
-                    return {}
+            result = await self._call_api(
+                "getWebhookInfo",
+                timeout=aiohttp.ClientTimeout(total=10, connect=5),
+                http_method="GET",
+                error_label="информация о веб-хуке"
+            )
+            if result and result.get('ok'):
+                return result.get('result', {})
+            return {}
 
         except Exception as e:
             print(f"❌ Ошибка получения информации о веб-хуке: {str(e)}")
             return {}
 
+    async def get_updates(self, offset: Optional[int] = None, timeout: int = 30, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Получает обновления долгим опросом (getUpdates).
+        Ошибки не подавляются: повторами с задержкой управляет вызывающий код.
+        """
+        data = {
+            'timeout': timeout,
+            'limit': limit,
+            'allowed_updates': json.dumps(['message', 'callback_query'])
+        }
+        if offset is not None:
+            data['offset'] = offset
+
+        result = await self._call_api(
+            "getUpdates",
+            data,
+            # Telegram держит запрос до timeout секунд, если обновлений нет
+            timeout=aiohttp.ClientTimeout(total=timeout + 10, connect=5),
+            error_label="получение обновлений"
+        )
+        if result is None or not result.get('ok'):
+            description = result.get('description') if result else "нет ответа"
+            raise RuntimeError(f"getUpdates не выполнен: {description}")
+        return result.get('result') or []
+
     # ОБНОВЛЕННЫЕ МЕТОДЫ ДЛЯ ОТПРАВКИ ОТЧЕТОВ
 
-    async def send_shift_report(self, report_data: Dict[str, Any], photo_path: str) -> bool:
+    async def send_shift_report(self, report_data: Dict[str, Any], photo_path: str,
+                                idempotency_key: Optional[str] = None) -> bool:
         """Отправляет отчет смены в Telegram"""
         if not self.enabled:
             print("🔕 Telegram отправка отключена (не настроен токен или chat_id)")
@@ -312,7 +367,8 @@ class TelegramService:
             message = self._format_shift_report_message(report_data)
 
             # Отправляем фото с подписью
-            success = await self._send_photo_with_caption(message, photo_path, topic_id)
+            success = await self._send_photo_with_caption(message, photo_path, topic_id, priority=PRIORITY_HIGH,
+                                                          idempotency_key=idempotency_key)
 
             if success:
                 print(f"✅ Отчет смены отправлен в Telegram для локации: {report_data.get('location')}")
@@ -325,7 +381,8 @@ class TelegramService:
             print(f"⚠️  Отчет смены создан, но ошибка отправки в Telegram: {str(e)}")
             return False
 
-    async def send_daily_inventory_report(self, report_data: Dict[str, Any]) -> bool:
+    async def send_daily_inventory_report(self, report_data: Dict[str, Any],
+                                          idempotency_key: Optional[str] = None) -> bool:
         """Отправляет отчет старой инвентаризации в Telegram (для обратной совместимости)"""
         if not self.enabled:
             print("🔕 Telegram отправка отключена (не настроен токен или chat_id)")
@@ -338,7 +395,8 @@ class TelegramService:
             message = self._format_daily_inventory_message(report_data)
 
             # Отправляем сообщение
-            success = await self._send_message(self.chat_id, message, topic_id)
+            success = await self._send_message(self.chat_id, message, topic_id,
+                                              idempotency_key=idempotency_key)
 
             if success:
                 print(f"✅ Отчет инвентаризации отправлен в Telegram для локации: {report_data.get('location')}")
@@ -352,7 +410,8 @@ class TelegramService:
             print(f"⚠️  Отчет инвентаризации создан, но ошибка отправки в Telegram: {str(e)}")
             return False
 
-    async def send_daily_inventory_v2_report(self, inventory_data: Dict[str, Any]) -> bool:
+    async def send_daily_inventory_v2_report(self, inventory_data: Dict[str, Any],
+                                             idempotency_key: Optional[str] = None) -> bool:
         """НОВЫЙ МЕТОД: Отправляет отчет новой инвентаризации v2 в Telegram"""
         if not self.enabled:
             print("🔕 Telegram отправка отключена (не настроен токен или chat_id)")
@@ -365,7 +424,8 @@ class TelegramService:
             message = self._format_daily_inventory_v2_message(inventory_data)
 
             # Отправляем сообщение
-            success = await self._send_message(self.chat_id, message, topic_id)
+            success = await self._send_message(self.chat_id, message, topic_id,
+                                              idempotency_key=idempotency_key)
 
             if success:
                 print(f"✅ Отчет инвентаризации v2 отправлен в Telegram для локации: {inventory_data.get('location')}")
@@ -379,8 +439,12 @@ class TelegramService:
             print(f"⚠️  Отчет инвентаризации v2 создан, но ошибка отправки в Telegram: {str(e)}")
             return False
 
-    async def send_goods_report(self, report_data: Dict[str, Any], photos: List[Dict[str, Any]]) -> bool:
-        """Отправляет отчет приема товаров в Telegram с фотографиями"""
+    async def send_goods_report(self, report_data: Dict[str, Any], photos: List[Dict[str, Any]],
+                                idempotency_key: Optional[str] = None) -> bool:
+        """
+        Отправляет отчет приема товаров в Telegram с фотографиями.
+        Фото передаются путем к файлу ({'path'}) или байтами ({'filename', 'content', 'content_type'}).
+        """
         if not self.enabled:
             print("🔕 Telegram отправка отключена (не настроен токен или chat_id)")
             return False
@@ -396,23 +460,33 @@ class TelegramService:
             # Если есть фотографии, отправляем их с сообщением
             if photos and len(photos) > 0:
                 # Если одна фотография - отправляем как фото с подписью
-                if len(photos) == 1:
+                if len(photos) == 1 and 'path' in photos[0]:
+                    success = await self._send_photo_with_caption(
+                        message,
+                        photos[0]['path'],
+                        topic_id,
+                        idempotency_key=idempotency_key
+                    )
+                elif len(photos) == 1:
                     success = await self._send_photo_with_caption_from_bytes(
                         message,
                         photos[0]['content'],
                         photos[0]['filename'],
-                        topic_id
+                        topic_id,
+                        idempotency_key=idempotency_key
                     )
                 else:
                     # Если несколько фотографий - отправляем как медиа-группу
                     success = await self._send_media_group_with_caption(
                         message,
                         photos,
-                        topic_id
+                        topic_id,
+                        idempotency_key=idempotency_key
                     )
             else:
                 # Если фотографий нет - отправляем только текстовое сообщение
-                success = await self._send_message(self.chat_id, message, topic_id)
+                success = await self._send_message(self.chat_id, message, topic_id,
+                                              idempotency_key=idempotency_key)
 
             if success:
                 print(f"✅ Отчет приема товаров отправлен в Telegram для локации: {report_data.get('location')}")
@@ -426,7 +500,8 @@ class TelegramService:
             print(f"⚠️  Отчет приема товаров создан, но ошибка отправки в Telegram: {str(e)}")
             return False
 
-    async def send_writeoff_transfer_report(self, report_data: Dict[str, Any]) -> bool:
+    async def send_writeoff_transfer_report(self, report_data: Dict[str, Any],
+                                            idempotency_key: Optional[str] = None) -> bool:
         """Отправляет акт списания/перемещения в Telegram"""
         if not self.enabled:
             print("🔕 Telegram отправка отключена (не настроен токен или chat_id)")
@@ -439,7 +514,8 @@ class TelegramService:
             message = self._format_writeoff_transfer_message(report_data)
 
             # Отправляем сообщение
-            success = await self._send_message(self.chat_id, message, topic_id)
+            success = await self._send_message(self.chat_id, message, topic_id,
+                                              idempotency_key=idempotency_key)
 
             if success:
                 print(f"✅ Акт списания/перемещения отправлен в Telegram для локации: {report_data.get('location')}")
@@ -527,6 +603,38 @@ class TelegramService:
 
         return message
 
+    def _format_daily_inventory_message(self, data: Dict[str, Any]) -> str:
+        """Форматирует сообщение старой инвентаризации (фиксированный набор товаров)"""
+        shift_emoji = "🌅" if data.get('shift_type') == 'morning' else "🌙"
+
+        user_date = data.get('date')
+        if user_date and hasattr(user_date, 'strftime'):
+            formatted_date = user_date.strftime('%d.%m.%Y %H:%M')
+        else:
+            formatted_date = datetime.now(ZoneInfo("UTC")).astimezone(ZoneInfo("Europe/Moscow")).strftime(
+                '%d.%m.%Y %H:%M')
+
+        drinks = DAILY_INVENTORY_DRINKS
+        food = DAILY_INVENTORY_FOOD
+
+        message = f"""📦 <b>ЕЖЕДНЕВНАЯ ИНВЕНТАРИЗАЦИЯ</b> {shift_emoji}
+
+📍 <b>Локация:</b> {data.get('location', 'Не указана')}
+👤 <b>Кассир:</b> {data.get('cashier_name', 'Не указан')}
+📅 <b>Смена:</b> {'Утренняя' if data.get('shift_type') == 'morning' else 'Ночная'}
+🕐 <b>Время проведения:</b> {formatted_date}
+
+🥤 <b>НАПИТКИ:</b>
+"""
+        for name, key in drinks:
+            message += f"• {name}: <b>{data.get(key, 0)} шт</b>\n"
+
+        message += "\n🍽️ <b>ЕДА:</b>\n"
+        for name, key in food:
+            message += f"• {name}: <b>{data.get(key, 0)} шт</b>\n"
+
+        return message
+
     def _format_daily_inventory_v2_message(self, data: Dict[str, Any]) -> str:
         """НОВЫЙ МЕТОД: Форматирует сообщение новой инвентаризации v2"""
         shift_emoji = "🌅" if data.get('shift_type') == 'morning' else "🌙"
@@ -714,11 +822,104 @@ class TelegramService:
 
     # ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ОТПРАВКИ
 
-    async def _send_message(self, chat_id: int, text: str, topic_id: Optional[int] = None) -> bool:
-        """Отправляет текстовое сообщение"""
+    async def _call_api(
+            self,
+            api_method: str,
+            data: Union[Dict[str, Any], Callable[[], Any], None] = None,
+            timeout: Optional[aiohttp.ClientTimeout] = None,
+            chat_id: Optional[Any] = None,
+            priority: int = PRIORITY_NORMAL,
+            cost: int = 1,
+            http_method: str = "POST",
+            error_label: str = "",
+            idempotency_key: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Единая точка вызова Telegram Bot API через общую сессию.
+
+        Сообщения в чат (chat_id задан) проходят через планировщик с учетом лимитов Telegram,
+        ответ 429 закрывает чат на retry_after секунд и запрос повторяется.
+        Сетевые сбои и 5xx повторяются по политике retry_policy с экспоненциальной задержкой.
+        data может быть фабрикой без аргументов (в том числе асинхронной) - FormData нельзя отправить дважды.
+
+        :param idempotency_key: Ключ сообщения; если сообщение с этим ключом уже отправлено,
+                                запрос не выполняется повторно
+        :return: Тело ответа Telegram при HTTP 200, иначе None
+        """
+        if idempotency_key is not None and idempotency_key in self.delivered_keys:
+            print(f"♻️  Сообщение {idempotency_key} уже отправлено в Telegram, повтор пропущен")
+            return {"ok": True, "result": None}
+
+        url = f"{self.base_url}/{api_method}"
+        session = await http_helper.get_session()
+        policy = self.retry_policy
+        attempt = 0
+
+        while True:
+            attempt += 1
+            can_retry = attempt < policy.max_attempts
+
+            if chat_id is not None:
+                await self.scheduler.acquire(chat_id, priority, cost)
+
+            payload = data() if callable(data) else data
+            if inspect.isawaitable(payload):
+                payload = await payload
+            started = time.perf_counter()
+
+            try:
+                async with session.request(http_method, url, data=payload, timeout=timeout) as response:
+                    if response.status == 200:
+                        result = await response.json(content_type=None)
+                        telegram_api_duration.observe(time.perf_counter() - started, method=api_method, status=200)
+                        if idempotency_key is not None:
+                            self.delivered_keys.add(idempotency_key)
+                        return result
+
+                    status = response.status
+                    response_text = await response.text()
+                    telegram_api_duration.observe(time.perf_counter() - started, method=api_method, status=status)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                telegram_api_duration.observe(time.perf_counter() - started, method=api_method, status="error")
+                if not (can_retry and policy.is_retryable_error(e, api_method)):
+                    raise
+                delay = policy.delay(attempt)
+                print(f"🔁 Сбой сети Telegram ({error_label}): {e.__class__.__name__} {str(e)}, "
+                      f"попытка {attempt}/{policy.max_attempts}, повтор через {delay:.1f} сек")
+                await asyncio.sleep(delay)
+                continue
+
+            if status == 429 and can_retry:
+                retry_after = self._parse_retry_after(response_text)
+                if chat_id is not None:
+                    self.scheduler.penalize(chat_id, retry_after)
+                else:
+                    await asyncio.sleep(retry_after)
+                continue
+
+            if can_retry and policy.is_retryable_status(status, api_method):
+                delay = policy.delay(attempt)
+                print(f"🔁 Telegram API ответил {status} ({error_label}), "
+                      f"попытка {attempt}/{policy.max_attempts}, повтор через {delay:.1f} сек")
+                await asyncio.sleep(delay)
+                continue
+
+            print(f"Telegram API ошибка ({error_label}): {status} - {response_text}")
+            return None
+
+    @staticmethod
+    def _parse_retry_after(response_text: str, default: float = 5) -> float:
+        """Достает retry_after из ответа 429"""
         try:
-            url = f"{self.base_url}/sendMessage"
+            parameters = json.loads(response_text).get('parameters') or {}
+            return float(parameters.get('retry_after', default))
+        except (ValueError, AttributeError):
+            return default
 
+    async def _send_message(self, chat_id: int, text: str, topic_id: Optional[int] = None,
+                            priority: int = PRIORITY_NORMAL, idempotency_key: Optional[str] = None) -> bool:
+        """Отправляет текстовое сообщение"""
+        try:
             data = {
                 'chat_id': chat_id,
                 'text': text,
@@ -728,14 +929,16 @@ class TelegramService:
             if topic_id:
                 data['message_thread_id'] = topic_id
 
-            timeout = aiohttp.ClientTimeout(total=10, connect=5)
-
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, data=data) as response:
-                    if response.status != 200:
-                        response_text = await response.text()
-                        print(f"Telegram API ошибка (текст): {response.status} - {response_text}")
-                    return response.status == 200
+            result = await self._call_api(
+                "sendMessage",
+                data,
+                timeout=aiohttp.ClientTimeout(total=10, connect=5),
+                chat_id=chat_id,
+                priority=priority,
+                error_label="текст",
+                idempotency_key=idempotency_key
+            )
+            return result is not None
 
         except (aiohttp.ClientError, socket.gaierror, OSError) as e:
             print(f"Ошибка сети при отправке сообщения в Telegram: {str(e)}")
@@ -744,75 +947,91 @@ class TelegramService:
             print(f"Неожиданная ошибка при отправке сообщения в Telegram: {str(e)}")
             return False
 
-    async def _send_photo_with_caption(self, caption: str, photo_path: str, topic_id: Optional[int] = None) -> bool:
-        """Отправляет фото с подписью"""
-        try:
-            url = f"{self.base_url}/sendPhoto"
-
-            # Создаем FormData для multipart/form-data
-            data = aiohttp.FormData()
-            data.add_field('chat_id', str(self.chat_id))
-            data.add_field('caption', caption)
-            data.add_field('parse_mode', 'HTML')
+    async def _send_photo_with_caption(self, caption: str, photo_path: str, topic_id: Optional[int] = None,
+                                       priority: int = PRIORITY_NORMAL,
+                                       idempotency_key: Optional[str] = None) -> bool:
+        """
+        Отправляет фото с подписью.
+        Файл не читается в память целиком: aiohttp отправляет его с диска порциями
+        (это может быть и оригинал до UPLOAD_MAX_PHOTO_SIZE, если копию создать не удалось).
+        Файл открывается для каждой попытки в отдельном потоке, не блокируя цикл событий.
+        """
+        # Файлы, открытые для каждой попытки отправки
+        opened_files = []
 
-            if topic_id:
-                data.add_field('message_thread_id', str(topic_id))
-
-            # Проверяем существование файла
-            if not Path(photo_path).exists():
-                print(f"Файл фотографии не найден: {photo_path}")
-                return False
-
-            # Добавляем файл
-            with open(photo_path, 'rb') as photo_file:
+        try:
+            async def build_data() -> aiohttp.FormData:
+                # Создаем FormData для multipart/form-data
+                data = aiohttp.FormData()
+                data.add_field('chat_id', str(self.chat_id))
+                data.add_field('caption', caption)
+                data.add_field('parse_mode', 'HTML')
+
+                if topic_id:
+                    data.add_field('message_thread_id', str(topic_id))
+
+                # Потоковая отправка файла с диска
+                photo_file = await asyncio.to_thread(open, photo_path, 'rb')
+                opened_files.append(photo_file)
                 data.add_field('photo', photo_file, filename='report.jpg', content_type='image/jpeg')
+                return data
+
+            result = await self._call_api(
+                "sendPhoto",
+                build_data,
+                timeout=aiohttp.ClientTimeout(total=30, connect=10),
+                chat_id=self.chat_id,
+                priority=priority,
+                error_label="фото",
+                idempotency_key=idempotency_key
+            )
+            return result is not None
 
-                timeout = aiohttp.ClientTimeout(total=30, connect=10)
-
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    async with session.post(url, data=data) as response:
-                        if response.status != 200:
-                            response_text = await response.text()
-                            print(f"Telegram API ошибка (фото): {response.status} - {response_text}")
-                        return response.status == 200
-
-        except (aiohttp.ClientError, socket.gaierror, OSError) as e:
-            print(f"Ошибка сети при отправке фото в Telegram: {str(e)}")
-            return False
         except FileNotFoundError:
             print(f"Файл фотографии не найден: {photo_path}")
             return False
+        except (aiohttp.ClientError, socket.gaierror, OSError) as e:
+            print(f"Ошибка сети при отправке фото в Telegram: {str(e)}")
+            return False
         except Exception as e:
             print(f"Неожиданная ошибка при отправке фото в Telegram: {str(e)}")
             return False
+        finally:
+            # Попытка могла оборваться до отправки тела - закрываем файлы явно
+            for photo_file in opened_files:
+                photo_file.close()
 
     async def _send_photo_with_caption_from_bytes(self, caption: str, photo_bytes: bytes, filename: str,
-                                                  topic_id: Optional[int] = None) -> bool:
+                                                  topic_id: Optional[int] = None,
+                                                  priority: int = PRIORITY_NORMAL,
+                                                  idempotency_key: Optional[str] = None) -> bool:
         """Отправляет фото из байтов с подписью"""
         try:
-            url = f"{self.base_url}/sendPhoto"
-
-            # Создаем FormData для multipart/form-data
-            data = aiohttp.FormData()
-            data.add_field('chat_id', str(self.chat_id))
-            data.add_field('caption', caption)
-            data.add_field('parse_mode', 'HTML')
-
-            if topic_id:
-                data.add_field('message_thread_id', str(topic_id))
-
-            # Добавляем файл из байтов
-            data.add_field('photo', io.BytesIO(photo_bytes), filename=filename or 'photo.jpg',
-                           content_type='image/jpeg')
-
-            timeout = aiohttp.ClientTimeout(total=30, connect=10)
-
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, data=data) as response:
-                    if response.status != 200:
-                        response_text = await response.text()
-                        print(f"Telegram API ошибка (фото из байтов): {response.status} - {response_text}")
-                    return response.status == 200
+            def build_data() -> aiohttp.FormData:
+                # Создаем FormData для multipart/form-data
+                data = aiohttp.FormData()
+                data.add_field('chat_id', str(self.chat_id))
+                data.add_field('caption', caption)
+                data.add_field('parse_mode', 'HTML')
+
+                if topic_id:
+                    data.add_field('message_thread_id', str(topic_id))
+
+                # Добавляем файл из байтов
+                data.add_field('photo', io.BytesIO(photo_bytes), filename=filename or 'photo.jpg',
+                               content_type='image/jpeg')
+                return data
+
+            result = await self._call_api(
+                "sendPhoto",
+                build_data,
+                timeout=aiohttp.ClientTimeout(total=30, connect=10),
+                chat_id=self.chat_id,
+                priority=priority,
+                error_label="фото из байтов",
+                idempotency_key=idempotency_key
+            )
+            return result is not None
 
         except (aiohttp.ClientError, socket.gaierror, OSError) as e:
             print(f"Ошибка сети при отправке фото из байтов в Telegram: {str(e)}")
@@ -822,62 +1041,82 @@ class TelegramService:
             return False
 
     async def _send_media_group_with_caption(self, caption: str, photos: List[Dict[str, Any]],
-                                             topic_id: Optional[int] = None) -> bool:
+                                             topic_id: Optional[int] = None,
+                                             priority: int = PRIORITY_NORMAL,
+                                             idempotency_key: Optional[str] = None) -> bool:
         """Отправляет группу фотографий с подписью к первой фотографии"""
-        try:
-            url = f"{self.base_url}/sendMediaGroup"
-
-            # Создаем FormData для multipart/form-data
-            data = aiohttp.FormData()
-            data.add_field('chat_id', str(self.chat_id))
-
-            if topic_id:
-                data.add_field('message_thread_id', str(topic_id))
-
-            # Подготавливаем медиа массив
-            media = []
-            for i, photo in enumerate(photos):
-                photo_key = f"photo_{i}"
-
-                # Добавляем файл
-                data.add_field(
-                    photo_key,
-                    io.BytesIO(photo['content']),
-                    filename=photo.get('filename', f'photo_{i}.jpg'),
-                    content_type=photo.get('content_type', 'image/jpeg')
-                )
-
-                # Создаем объект медиа
-                media_item = {
-                    "type": "photo",
-                    "media": f"attach://{photo_key}"
-                }
-
-                # Добавляем подпись к первой фотографии
-                if i == 0:
-                    media_item["caption"] = caption
-                    media_item["parse_mode"] = "HTML"
-
-                media.append(media_item)
-
-            # Добавляем медиа массив как JSON
-            data.add_field('media', json.dumps(media))
-
-            timeout = aiohttp.ClientTimeout(total=60, connect=15)
-
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, data=data) as response:
-                    if response.status != 200:
-                        response_text = await response.text()
-                        print(f"Telegram API ошибка (медиа группа): {response.status} - {response_text}")
-                    return response.status == 200
+        # Файлы, открытые для каждой попытки отправки
+        opened_files = []
 
+        try:
+            async def build_data() -> aiohttp.FormData:
+                # Создаем FormData для multipart/form-data
+                data = aiohttp.FormData()
+                data.add_field('chat_id', str(self.chat_id))
+
+                if topic_id:
+                    data.add_field('message_thread_id', str(topic_id))
+
+                # Подготавливаем медиа массив
+                media = []
+                for i, photo in enumerate(photos):
+                    photo_key = f"photo_{i}"
+
+                    # Добавляем файл: с диска потоково (открываем в отдельном потоке) или из байтов
+                    if 'path' in photo:
+                        photo_file = await asyncio.to_thread(open, photo['path'], 'rb')
+                        opened_files.append(photo_file)
+                        data.add_field(photo_key, photo_file, filename=f'photo_{i}.jpg', content_type='image/jpeg')
+                    else:
+                        data.add_field(
+                            photo_key,
+                            io.BytesIO(photo['content']),
+                            filename=photo.get('filename', f'photo_{i}.jpg'),
+                            content_type=photo.get('content_type', 'image/jpeg')
+                        )
+
+                    # Создаем объект медиа
+                    media_item = {
+                        "type": "photo",
+                        "media": f"attach://{photo_key}"
+                    }
+
+                    # Добавляем подпись к первой фотографии
+                    if i == 0:
+                        media_item["caption"] = caption
+                        media_item["parse_mode"] = "HTML"
+
+                    media.append(media_item)
+
+                # Добавляем медиа массив как JSON
+                data.add_field('media', json.dumps(media))
+                return data
+
+            # Каждая фотография медиа-группы считается отдельным сообщением в лимитах Telegram
+            result = await self._call_api(
+                "sendMediaGroup",
+                build_data,
+                timeout=aiohttp.ClientTimeout(total=60, connect=15),
+                chat_id=self.chat_id,
+                priority=priority,
+                cost=len(photos),
+                error_label="медиа группа",
+                idempotency_key=idempotency_key
+            )
+            return result is not None
+
+        except FileNotFoundError as e:
+            print(f"Файл фотографии не найден: {e.filename}")
+            return False
         except (aiohttp.ClientError, socket.gaierror, OSError) as e:
             print(f"Ошибка сети при отправке медиа группы в Telegram: {str(e)}")
             return False
         except Exception as e:
             print(f"Неожиданная ошибка при отправке медиа группы в Telegram: {str(e)}")
             return False
+        finally:
+            for photo_file in opened_files:
+                photo_file.close()
 
     async def send_photos_to_location(self, location: str, photos: List[Dict[str, Any]],
                                       message: Optional[str] = None) -> bool:
@@ -909,14 +1148,16 @@ class TelegramService:
                     message,
                     photos[0]['content'],
                     photos[0]['filename'],
-                    topic_id
+                    topic_id,
+                    priority=PRIORITY_LOW
                 )
             else:
                 # Если несколько фотографий - отправляем как медиа-группу
                 success = await self._send_media_group_with_caption(
                     message,
                     photos,
-                    topic_id
+                    topic_id,
+                    priority=PRIORITY_LOW
                 )
 
             if success:
@@ -928,4 +1169,19 @@ class TelegramService:
 
         except Exception as e:
             print(f"⚠️  Ошибка отправки фотографий в Telegram: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+
+# Единый экземпляр сервиса на процесс: пулы, кэши и лимиты общие для всех типов отчетов
+_telegram_service: Optional[TelegramService] = None
+
+
+def get_telegram_service() -> TelegramService:
+    """
+    Возвращает общий экземпляр TelegramService, создавая его при первом обращении.
+    Используется как FastAPI зависимость и в CRUD классах.
+    """
+    global _telegram_service
+    if _telegram_service is None:
+        _telegram_service = TelegramService()
+    return _telegram_service
@@ -0,0 +1,150 @@
+# backend/app/services/update_dedup.py
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+from app.models import TelegramProcessedUpdate
+from app.services.telegram_retry import DeliveredKeys
+
+
+class UpdateDeduplicator:
+    """
+    Защита от повторной обработки обновлений Telegram по update_id.
+
+    Telegram повторяет доставку, если веб-хук ответил медленно или с ошибкой.
+    Обработанные update_id хранятся в ограниченном по размеру и времени кэше процесса,
+    а при persist=True еще и в таблице telegram_processed_update, чтобы дубли
+    отсекались между воркерами и после рестарта.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 24 * 60 * 60, persist: bool = False, cleanup_every: int = 500):
+        self.ttl = ttl
+        self.persist = persist
+        self.cleanup_every = cleanup_every
+        self._seen = DeliveredKeys(max_size=max_size, ttl=ttl)
+        self._inserts_since_cleanup = 0
+
+        self.checked_total = 0
+        self.duplicates_memory_total = 0
+        self.duplicates_db_total = 0
+
+    async def claim(self, update_id: int, db: Optional[AsyncSession] = None) -> bool:
+        """
+        Отмечает обновление как обработанное.
+
+        :return: True, если обновление пришло впервые и его нужно обработать
+        """
+        self.checked_total += 1
+        key = str(update_id)
+
+        if key in self._seen:
+            self.duplicates_memory_total += 1
+            return False
+        # Отмечаем до обработки: повторная доставка, пришедшая во время обработки, тоже дубль
+        self._seen.add(key)
+
+        if not self.persist or db is None:
+            return True
+
+        try:
+            if not await self._claim_in_db(db, update_id):
+                self.duplicates_db_total += 1
+                return False
+        except Exception as e:
+            # База недоступна - обрабатываем, полагаясь только на кэш процесса
+            await db.rollback()
+            print(f"⚠️  Не удалось сохранить update_id {update_id}: {str(e)}")
+
+        return True
+
+    @staticmethod
+    def _insert(db: AsyncSession):
+        """INSERT с поддержкой ON CONFLICT для PostgreSQL и SQLite, для остальных СУБД - None"""
+        dialect = db.bind.dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(TelegramProcessedUpdate)
+        if dialect == "sqlite":
+            return sqlite.insert(TelegramProcessedUpdate)
+        return None
+
+    async def _claim_in_db(self, db: AsyncSession, update_id: int) -> bool:
+        """INSERT ... ON CONFLICT DO NOTHING: строка вставлена - обновление новое"""
+        statement = self._insert(db)
+        if statement is None:
+            claimed = await self._claim_fallback(db, update_id)
+        else:
+            result = await db.execute(
+                statement
+                .values(update_id=update_id)
+                .on_conflict_do_nothing(index_elements=["update_id"])
+                .returning(TelegramProcessedUpdate.update_id)
+            )
+            claimed = result.scalar_one_or_none() is not None
+
+        self._inserts_since_cleanup += 1
+        if self._inserts_since_cleanup >= self.cleanup_every:
+            self._inserts_since_cleanup = 0
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl)
+            await db.execute(delete(TelegramProcessedUpdate).where(TelegramProcessedUpdate.processed_at < cutoff))
+
+        await db.commit()
+        return claimed
+
+    @staticmethod
+    async def _claim_fallback(db: AsyncSession, update_id: int) -> bool:
+        """
+        То же без ON CONFLICT: SELECT, затем INSERT в точке сохранения.
+        Одновременную вставку того же update_id другим воркером отклонит первичный ключ.
+        """
+        if await db.get(TelegramProcessedUpdate, update_id) is not None:
+            return False
+
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(TelegramProcessedUpdate).values(update_id=update_id))
+        except IntegrityError:
+            return False
+        return True
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Счетчики проверок и доля дублей"""
+        duplicates = self.duplicates_memory_total + self.duplicates_db_total
+        return {
+            "persist": self.persist,
+            "checked_total": self.checked_total,
+            "duplicates_total": duplicates,
+            "duplicates_memory_total": self.duplicates_memory_total,
+            "duplicates_db_total": self.duplicates_db_total,
+            "hit_rate": round(duplicates / self.checked_total, 4) if self.checked_total else 0.0,
+        }
+
+
+# Создание экземпляра UpdateDeduplicator с настройками из конфигурации
+update_deduplicator = UpdateDeduplicator(
+    max_size=settings.TELEGRAM_UPDATE_DEDUP_SIZE,
+    ttl=settings.TELEGRAM_UPDATE_DEDUP_TTL,
+    persist=settings.TELEGRAM_UPDATE_DEDUP_PERSIST,
+)
+
+metrics_registry.gauge_callback(
+    "telegram_update_dedup_checked_total",
+    "Проверенных на повтор обновлений Telegram",
+    lambda: {(): update_deduplicator.checked_total},
+    metric_type="counter"
+)
+metrics_registry.gauge_callback(
+    "telegram_update_duplicates_total",
+    "Повторно доставленных обновлений Telegram, которые не обрабатывались",
+    lambda: {
+        ("memory",): update_deduplicator.duplicates_memory_total,
+        ("db",): update_deduplicator.duplicates_db_total,
+    },
+    labelnames=("source",),
+    metric_type="counter"
+)
@@ -0,0 +1,155 @@
+# backend/app/services/update_poller.py
+import asyncio
+from typing import Optional
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+from app.schemas.telegram import TelegramUpdate
+from app.services.telegram_retry import RetryPolicy
+from app.services.telegram_service import get_telegram_service
+from app.services.update_queue import TelegramUpdateQueue, update_queue
+
+
+class TelegramUpdatePoller:
+    """
+    Получение обновлений долгим опросом getUpdates - замена веб-хука там,
+    где нет публичного WEBHOOK_URL (стенды, локальные серверы, нагрузочные тесты
+    с фейковым Bot API через TELEGRAM_API_URL).
+
+    Полученные обновления идут в ту же очередь и те же обработчики, что и обновления
+    веб-хука. offset сдвигается после того, как пачка поставлена в очередь.
+    """
+
+    def __init__(
+            self,
+            queue: TelegramUpdateQueue,
+            timeout: int = 30,
+            limit: int = 100,
+            backoff_base: float = 1,
+            backoff_max: float = 60,
+    ):
+        self.queue = queue
+        self.timeout = timeout
+        self.limit = limit
+        self.backoff = RetryPolicy(backoff_base=backoff_base, backoff_max=backoff_max)
+
+        self.offset: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.received_total = 0
+        self.errors_total = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Запускает фоновый цикл опроса"""
+        if self.running:
+            return
+
+        self._stopping = False
+        self._task = asyncio.create_task(self.run(), name="telegram-update-poller")
+        print(f"🛰  Опрос обновлений Telegram запущен (getUpdates, timeout {self.timeout} сек)")
+
+    async def stop(self) -> None:
+        """Останавливает опрос; уже полученные обновления дорабатывает очередь"""
+        self._stopping = True
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        print("🛰  Опрос обновлений Telegram остановлен")
+
+    async def run(self) -> None:
+        """Цикл опроса до вызова stop()"""
+        telegram_service = get_telegram_service()
+        if not telegram_service.enabled:
+            print("⚠️  Telegram не настроен, опрос обновлений не запущен")
+            return
+
+        # getUpdates не работает, пока установлен веб-хук
+        await telegram_service.delete_webhook()
+
+        failures = 0
+        while not self._stopping:
+            try:
+                processed = await self.poll_once()
+                failures = 0
+                if processed:
+                    print(f"📨 Получено обновлений Telegram: {processed}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                self.errors_total += 1
+                delay = self.backoff.delay(failures)
+                print(f"⚠️  Ошибка опроса обновлений Telegram: {str(e)}, повтор через {delay:.1f} сек")
+                await asyncio.sleep(delay)
+
+    async def poll_once(self) -> int:
+        """
+        Один запрос getUpdates и постановка полученной пачки в очередь.
+
+        :return: Количество полученных обновлений
+        """
+        updates = await get_telegram_service().get_updates(
+            offset=self.offset,
+            timeout=self.timeout,
+            limit=self.limit
+        )
+
+        for raw in updates:
+            update_id = raw.get("update_id")
+            try:
+                update = TelegramUpdate.model_validate(raw)
+            except ValidationError as e:
+                print(f"⚠️  Некорректное обновление Telegram {update_id}: {str(e)}")
+            else:
+                # Ждем места в очереди: пока обработчики заняты, новые обновления не запрашиваем
+                await self.queue.put(update)
+
+            if update_id is not None:
+                self.offset = update_id + 1
+
+        self.received_total += len(updates)
+        return len(updates)
+
+    def get_metrics(self):
+        return {
+            "running": self.running,
+            "offset": self.offset,
+            "received_total": self.received_total,
+            "errors_total": self.errors_total,
+        }
+
+
+# Создание экземпляра TelegramUpdatePoller с настройками из конфигурации
+update_poller = TelegramUpdatePoller(
+    queue=update_queue,
+    timeout=settings.TELEGRAM_POLLING_TIMEOUT,
+    limit=settings.TELEGRAM_POLLING_LIMIT,
+    backoff_base=settings.TELEGRAM_POLLING_BACKOFF_BASE,
+    backoff_max=settings.TELEGRAM_POLLING_BACKOFF_MAX,
+)
+
+metrics_registry.gauge_callback(
+    "telegram_polling_received_total",
+    "Обновлений Telegram, полученных через getUpdates",
+    lambda: {(): update_poller.received_total},
+    metric_type="counter"
+)
+metrics_registry.gauge_callback(
+    "telegram_polling_errors_total",
+    "Ошибок запросов getUpdates",
+    lambda: {(): update_poller.errors_total},
+    metric_type="counter"
+)
@@ -0,0 +1,174 @@
+# backend/app/services/update_queue.py
+import asyncio
+import time
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.database import db_helper
+from app.core.metrics import metrics_registry
+from app.schemas.telegram import TelegramUpdate
+from app.services.telegram_service import get_telegram_service
+
+telegram_update_duration = metrics_registry.histogram(
+    "telegram_update_duration_seconds",
+    "Время обработки входящего обновления Telegram",
+    labelnames=("outcome",)
+)
+
+
+class TelegramUpdateQueue:
+    """
+    Очередь входящих обновлений Telegram.
+
+    Веб-хук только кладет обновление в ограниченную очередь и сразу отвечает 200,
+    а ответы пользователям (sendMessage и т.п.) отправляют фоновые обработчики.
+    Если очередь переполнена, веб-хук отвечает ошибкой и Telegram повторит доставку позже.
+    """
+
+    def __init__(self, max_size: int = 1000, workers: int = 4, handle_timeout: float = 30):
+        self.max_size = max_size
+        self.workers = workers
+        self.handle_timeout = handle_timeout
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.accepted_total = 0
+        self.rejected_total = 0
+        self.processed_total = 0
+        self.failed_total = 0
+        # Обновлений, обрабатываемых прямо сейчас
+        self.in_flight = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def submit(self, update: TelegramUpdate) -> bool:
+        """
+        Ставит обновление в очередь без ожидания.
+
+        :return: False, если очередь не запущена или переполнена
+        """
+        if self._queue is None:
+            self.rejected_total += 1
+            return False
+
+        try:
+            self._queue.put_nowait(update)
+        except asyncio.QueueFull:
+            self.rejected_total += 1
+            print(f"⚠️  Очередь обновлений Telegram переполнена ({self.max_size}), update_id={update.update_id}")
+            return False
+
+        self.accepted_total += 1
+        return True
+
+    async def put(self, update: TelegramUpdate) -> None:
+        """Ставит обновление в очередь, дожидаясь места (для опроса getUpdates)"""
+        if self._queue is None:
+            raise RuntimeError("Очередь обновлений Telegram не запущена")
+        await self._queue.put(update)
+        self.accepted_total += 1
+
+    async def start(self) -> None:
+        """Запускает обработчики очереди"""
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"telegram-update-worker-{n}")
+            for n in range(self.workers)
+        ]
+        print(f"📥 Очередь обновлений Telegram запущена (обработчиков: {self.workers})")
+
+    async def stop(self, timeout: float = 5) -> None:
+        """
+        Дает обработчикам разобрать очередь в пределах timeout и останавливает их.
+        Необработанные обновления теряются: Telegram уже получил подтверждение.
+        """
+        if not self.running:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️  Не обработано обновлений Telegram при остановке: {self._queue.qsize()}")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        print("📤 Очередь обновлений Telegram остановлена")
+
+    async def _worker(self) -> None:
+        while True:
+            update = await self._queue.get()
+            try:
+                await self.process(update)
+            finally:
+                self._queue.task_done()
+
+    async def process(self, update: TelegramUpdate) -> None:
+        """Обрабатывает одно обновление; ошибки только логируются"""
+        started = time.perf_counter()
+        outcome = "ok"
+        self.in_flight += 1
+        try:
+            # Сессия подключается к БД только при первом запросе, поэтому обработчики,
+            # которым база не нужна, соединение из пула не занимают
+            async with db_helper.session_factory() as db:
+                await asyncio.wait_for(
+                    get_telegram_service().handle_update(update, db),
+                    timeout=self.handle_timeout
+                )
+            self.processed_total += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            self.failed_total += 1
+            print(f"⚠️  Обработка обновления Telegram {update.update_id} превысила {self.handle_timeout} сек")
+        except Exception as e:
+            outcome = "error"
+            self.failed_total += 1
+            print(f"❌ Ошибка обработки обновления Telegram {update.update_id}: {str(e)}")
+        finally:
+            self.in_flight -= 1
+            telegram_update_duration.observe(time.perf_counter() - started, outcome=outcome)
+
+    def get_metrics(self):
+        """Глубина очереди и счетчики обработки"""
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "accepted_total": self.accepted_total,
+            "rejected_total": self.rejected_total,
+            "processed_total": self.processed_total,
+            "failed_total": self.failed_total,
+        }
+
+
+# Создание экземпляра TelegramUpdateQueue с настройками из конфигурации
+update_queue = TelegramUpdateQueue(
+    max_size=settings.TELEGRAM_UPDATE_QUEUE_SIZE,
+    workers=settings.TELEGRAM_UPDATE_WORKERS,
+    handle_timeout=settings.TELEGRAM_UPDATE_TIMEOUT,
+)
+
+metrics_registry.gauge_callback(
+    "telegram_update_queue_depth",
+    "Входящих обновлений Telegram в очереди",
+    lambda: {(): update_queue.get_metrics()["queue_depth"]}
+)
+metrics_registry.gauge_callback(
+    "telegram_update_rejected_total",
+    "Обновлений Telegram, не принятых из-за переполненной очереди",
+    lambda: {(): update_queue.rejected_total},
+    metric_type="counter"
+)
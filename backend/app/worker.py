@@ -0,0 +1,44 @@
+"""
+Отдельный процесс получения обновлений Telegram через getUpdates.
+
+Используется, когда API запущен с TELEGRAM_UPDATES_MODE=none (или без публичного
+WEBHOOK_URL): обновления забирает и обрабатывает этот воркер, независимо от HTTP воркеров.
+Запускать можно только один экземпляр на бота - Telegram не отдает getUpdates параллельно.
+
+Запуск из папки backend:
+
+    python -m app.worker
+"""
+import asyncio
+import signal
+
+from app.core.database import db_helper
+from app.core.http_client import http_helper
+from app.services import get_telegram_service, send_scheduler, update_poller, update_queue
+
+
+async def main() -> None:
+    print("🚀 Запуск воркера обновлений Telegram...")
+    get_telegram_service()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await update_queue.start()
+    await update_poller.start()
+    try:
+        await stop_event.wait()
+    finally:
+        # Прекращаем опрос и дорабатываем принятые обновления
+        await update_poller.stop()
+        await update_queue.stop()
+        await send_scheduler.close()
+        await http_helper.close()
+        await db_helper.dispose()
+        print("👋 Воркер обновлений Telegram остановлен")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())